@@ -2,135 +2,340 @@
 Deg Bot - Discord Bot for Coaching Management
 Main entry point
 """
+import aiohttp
 import discord
+from discord import app_commands
 from discord.ext import commands
 import asyncio
+import compileall
+import hashlib
+import json
+import logging
+import os
+import queue
 import sys
-import traceback
+from logging.handlers import QueueHandler, QueueListener
 import config
-from database import init_db
+from utils.embeds import create_error_embed
 
-# Fix encoding for Windows console
+# Fix encoding for Windows console (in place, keeps the original streams and buffering)
 if sys.platform == 'win32':
-    import io
-    sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
-    sys.stderr = io.TextIOWrapper(sys.stderr.buffer, encoding='utf-8')
+    sys.stdout.reconfigure(encoding='utf-8', errors='replace')
+    sys.stderr.reconfigure(encoding='utf-8', errors='replace')
+
+logger = logging.getLogger('deg_bot')
+
+
+class LocalQueueHandler(QueueHandler):
+    """
+    Queue handler for an in-process queue
+
+    The base class formats each record (tracebacks included) before
+    enqueuing it; records never leave the process here, so formatting is
+    left to the listener thread.
+    """
+
+    def prepare(self, record):
+        return record
+
+
+def setup_logging() -> QueueListener:
+    """
+    Route log records through a queue so console writes happen on a background thread
+    """
+    log_queue = queue.SimpleQueue()
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(logging.Formatter(
+        '%(asctime)s [%(levelname)s] %(name)s: %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    ))
+
+    root_logger = logging.getLogger()
+    root_logger.setLevel(logging.DEBUG if config.DEBUG_LOGGING else logging.INFO)
+    root_logger.addHandler(LocalQueueHandler(log_queue))
+
+    listener = QueueListener(log_queue, console_handler)
+    listener.start()
+    return listener
+
+
+def install_event_loop_policy():
+    """
+    Use uvloop (or winloop on Windows) as the asyncio event loop when it is installed
+    """
+    try:
+        if sys.platform == 'win32':
+            import winloop as fast_loop
+        else:
+            import uvloop as fast_loop
+    except ImportError:
+        return
+    asyncio.set_event_loop_policy(fast_loop.EventLoopPolicy())
+
 
 # Bot intents
 intents = discord.Intents.default()
 intents.message_content = True
+# Required: coach DMs iterate coach_role.members, which needs the chunked member cache
 intents.members = True
 intents.guilds = True
 
+# Only keep members that joined/were chunked; voice state isn't used by any cog
+member_cache_flags = discord.MemberCacheFlags.from_intents(intents)
+member_cache_flags.voice = False
+
+# HTTP connection pool sizes for the Discord API client
+HTTP_CONNECTION_LIMIT = 200
+HTTP_CONNECTION_LIMIT_PER_HOST = 64
+
+# Set after the first READY so reconnects skip the one-time startup work
+_ready_once = asyncio.Event()
+
+# Bot status shown in the member list
+BOT_ACTIVITY = discord.Activity(
+    type=discord.ActivityType.watching,
+    name="vos réservations | /help"
+)
+
+
+class DegBot(commands.Bot):
+    """
+    Bot doing its one-time startup work in setup_hook instead of on_ready
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._background_tasks = set()  # Strong references to fire-and-forget tasks
+
+    async def setup_hook(self):
+        """
+        Called once after login, before connecting to the gateway
+        """
+        # Refresh the bytecode of the bot packages off the event loop before importing the cogs
+        await asyncio.to_thread(precompile_packages)
+        await load_cogs()
+
+        # Sync commands in the background, overlapping the gateway handshake
+        _start_command_sync()
+
+
 # Create bot instance
-bot = commands.Bot(
+bot = DegBot(
     command_prefix=config.BOT_PREFIX,
     intents=intents,
+    member_cache_flags=member_cache_flags,
     help_command=None  # We'll create a custom help command
 )
 
-# List of cogs to load
-COGS = [
+# File storing, per sync scope, the hash of the last command tree synced with Discord
+TREE_HASH_FILE = '.tree_hash.json'
+
+# Packages imported (directly or through the cogs) when the cogs are loaded
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+BOT_PACKAGES = ('cogs', 'views', 'utils', 'database')
+
+# Cogs to load (extension names interned, immutable so reloads can't mutate it)
+COGS = tuple(sys.intern(cog) for cog in (
     'cogs.tickets',
     'cogs.reminders',
     'cogs.feedback',
     'cogs.admin',
     'cogs.stats',
     'cogs.analytics',
-    # 'cogs.calendar_sync',
-    # 'cogs.events',
-]
+))
 
 
-@bot.event
-async def on_ready():
+def _command_to_dict(command) -> dict:
     """
-    Called when the bot is ready and connected to Discord
+    Serialize an application command the way it is sent to Discord
     """
-    print(f'\n{"-" * 50}')
-    print(f'Bot connecté en tant que: {bot.user.name} (ID: {bot.user.id})')
-    print(f'discord.py version: {discord.__version__}')
-    print(f'{"-" * 50}\n')
+    try:
+        return command.to_dict(bot.tree)  # discord.py >= 2.4
+    except TypeError:
+        return command.to_dict()
 
-    # Set bot status
-    activity = discord.Activity(
-        type=discord.ActivityType.watching,
-        name="vos réservations | /help"
+
+def _command_tree_hash(guild=None) -> str:
+    """
+    Compute a stable hash of the global commands (plus the guild's own commands)
+
+    The guild tree is a copy of the global one, so hashing before
+    copy_global_to() lets both the copy and the sync be skipped.
+    """
+    payload = json.dumps(
+        {
+            'global': [_command_to_dict(c) for c in bot.tree.get_commands()],
+            'guild': [_command_to_dict(c) for c in bot.tree.get_commands(guild=guild)] if guild else [],
+        },
+        sort_keys=True
     )
-    await bot.change_presence(activity=activity)
+    return hashlib.blake2b(payload.encode(), digest_size=16).hexdigest()
 
-    print(f'Serveurs: {len(bot.guilds)}')
-    for guild in bot.guilds:
-        print(f'  - {guild.name} (ID: {guild.id})')
 
-    # Sync commands with Discord
+def _read_tree_hashes() -> dict:
+    """
+    Read the hashes of the last synced command trees, keyed by scope
+    """
     try:
-        if config.GUILD_ID:
-            guild = discord.Object(id=config.GUILD_ID)
-            bot.tree.copy_global_to(guild=guild)
-            await bot.tree.sync(guild=guild)
-            print(f'✅ Commandes synchronisées pour le serveur {config.GUILD_ID}')
+        with open(TREE_HASH_FILE, encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_tree_hash(scope: str, value: str):
+    """
+    Atomically persist the hash of the command tree synced for a scope
+    """
+    hashes = _read_tree_hashes()
+    hashes[scope] = value
+    tmp_path = f'{TREE_HASH_FILE}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(hashes, f)
+    os.replace(tmp_path, TREE_HASH_FILE)
+
+
+async def _sync_commands():
+    """
+    Sync application commands with Discord (skipped when the command tree is unchanged)
+    """
+    try:
+        guild = discord.Object(id=config.GUILD_ID) if config.GUILD_ID else None
+        scope = f'guild:{config.GUILD_ID}' if guild else 'global'
+
+        tree_hash = _command_tree_hash(guild)
+        if tree_hash == _read_tree_hashes().get(scope):
+            # Guild interactions fall back to the global commands, no copy needed
+            logger.info('✅ Commandes inchangées, synchronisation ignorée')
         else:
-            await bot.tree.sync()
-            print('✅ Commandes synchronisées globalement')
-    except Exception as e:
-        print(f'❌ Erreur lors de la synchronisation des commandes: {e}')
+            if guild:
+                bot.tree.copy_global_to(guild=guild)
+            await bot.tree.sync(guild=guild)
+            _write_tree_hash(scope, tree_hash)
+            if guild:
+                logger.info('✅ Commandes synchronisées pour le serveur %s', config.GUILD_ID)
+            else:
+                logger.info('✅ Commandes synchronisées globalement')
+    except Exception:
+        logger.exception('❌ Erreur lors de la synchronisation des commandes')
 
-    print(f'\nBot prêt! 🚀\n')
+
+def _start_command_sync():
+    """
+    Start the command sync as a background task, keeping a reference to it
+    """
+    task = asyncio.create_task(_sync_commands(), name="cmd-sync")
+    bot._background_tasks.add(task)
+    task.add_done_callback(bot._background_tasks.discard)
 
 
 @bot.event
-async def on_command_error(ctx, error):
+async def on_ready():
     """
-    Global error handler for commands
+    Called when the bot is ready and connected to Discord
     """
-    # Ignore command not found errors
-    if isinstance(error, commands.CommandNotFound):
-        return
+    # Discord clears the presence on reconnect, so it is set on every READY
+    await bot.change_presence(activity=BOT_ACTIVITY)
 
-    # Check failures (permissions)
-    if isinstance(error, commands.CheckFailure):
-        await ctx.send(str(error), ephemeral=True)
+    if _ready_once.is_set():
         return
+    _ready_once.set()
 
-    # Missing required argument
-    if isinstance(error, commands.MissingRequiredArgument):
-        await ctx.send(
-            f"❌ Argument manquant: `{error.param.name}`\n"
-            f"Utilisez `/help {ctx.command.name}` pour plus d'informations.",
-            ephemeral=True
-        )
-        return
+    logger.info('Bot connecté en tant que: %s (ID: %s)', bot.user.name, bot.user.id)
+    logger.info('discord.py version: %s', discord.__version__)
+    logger.info('Serveurs: %d', len(bot.guilds))
+    for guild in bot.guilds:
+        logger.info('  - %s (ID: %s)', guild.name, guild.id)
+    logger.info('Bot prêt! 🚀')
 
-    # User input errors
-    if isinstance(error, (commands.BadArgument, commands.BadUnionArgument)):
-        await ctx.send(
-            f"❌ Argument invalide.\n"
-            f"Utilisez `/help {ctx.command.name}` pour plus d'informations.",
-            ephemeral=True
-        )
-        return
 
-    # Command on cooldown
-    if isinstance(error, commands.CommandOnCooldown):
-        await ctx.send(
-            f"⏰ Cette commande est en cooldown. Réessayez dans {error.retry_after:.1f} secondes.",
-            ephemeral=True
-        )
-        return
+# Error messages sent back to the user
+HELP_HINT = "Utilisez `/help {command}` pour plus d'informations."
+MISSING_ARGUMENT_MESSAGE = "❌ Argument manquant: `{param}`\n" + HELP_HINT
+BAD_ARGUMENT_MESSAGE = "❌ Argument invalide.\n" + HELP_HINT
+COOLDOWN_MESSAGE = "⏰ Cette commande est en cooldown. Réessayez dans {retry_after:.1f} secondes."
+UNEXPECTED_ERROR_MESSAGE = "❌ Une erreur inattendue s'est produite. L'erreur a été enregistrée."
+
+
+async def _safe_send(ctx, message: str, retries: int = 1):
+    """
+    Send an error message without letting a failed send raise back into the dispatcher
+
+    Rate-limited sends are retried once after the delay Discord asks for.
+    """
+    for attempt in range(retries + 1):
+        try:
+            await ctx.send(message, ephemeral=True)
+            return
+        except discord.HTTPException as e:
+            if e.status == 429 and attempt < retries:
+                await asyncio.sleep(getattr(e, 'retry_after', 1.0))
+                continue
+            logger.debug("Impossible d'envoyer le message d'erreur: %s", e)
+            return
+
+
+async def _ignore_error(ctx, error):
+    """
+    Silently ignore the error (e.g. unknown commands)
+    """
+
+
+async def _send_check_failure(ctx, error):
+    """
+    Check failures (permissions) carry their own message
+    """
+    await _safe_send(ctx, str(error))
+
+
+async def _send_missing_argument(ctx, error):
+    await _safe_send(ctx, MISSING_ARGUMENT_MESSAGE.format(param=error.param.name, command=ctx.command.name))
+
+
+async def _send_bad_argument(ctx, error):
+    await _safe_send(ctx, BAD_ARGUMENT_MESSAGE.format(command=ctx.command.name))
+
+
+async def _send_cooldown(ctx, error):
+    await _safe_send(ctx, COOLDOWN_MESSAGE.format(retry_after=error.retry_after))
+
+
+async def _handle_unexpected_error(ctx, error):
+    """
+    Log unexpected errors and inform the user
+    """
+    logger.error('Erreur dans la commande %s', ctx.command, exc_info=error)
+    await _safe_send(ctx, UNEXPECTED_ERROR_MESSAGE)
+
+
+# Error type -> handler, resolved against the error's MRO so subclasses are covered
+_ERROR_HANDLERS = {
+    commands.CommandNotFound: _ignore_error,
+    commands.CheckFailure: _send_check_failure,
+    commands.MissingRequiredArgument: _send_missing_argument,
+    commands.BadArgument: _send_bad_argument,
+    commands.BadUnionArgument: _send_bad_argument,
+    commands.CommandOnCooldown: _send_cooldown,
+}
 
-    # Log unexpected errors
-    print(f'\n{"=" * 50}')
-    print(f'Erreur dans la commande {ctx.command}:')
-    print(f'{"=" * 50}')
-    traceback.print_exception(type(error), error, error.__traceback__)
-    print(f'{"=" * 50}\n')
-
-    # Inform user
-    await ctx.send(
-        "❌ Une erreur inattendue s'est produite. L'erreur a été enregistrée.",
-        ephemeral=True
-    )
+
+def _get_error_handler(error):
+    """
+    Find the handler registered for the closest class of the error
+    """
+    for error_type in type(error).__mro__:
+        handler = _ERROR_HANDLERS.get(error_type)
+        if handler:
+            return handler
+    return _handle_unexpected_error
+
+
+@bot.event
+async def on_command_error(ctx, error):
+    """
+    Global error handler for commands
+    """
+    await _get_error_handler(error)(ctx, error)
 
 
 @bot.event
@@ -141,58 +346,108 @@ async def on_application_command_error(ctx, error):
     await on_command_error(ctx, error)
 
 
+@bot.tree.error
+async def on_app_command_error(interaction: discord.Interaction, error: app_commands.AppCommandError):
+    """
+    Global error handler for the slash command tree
+    """
+    if isinstance(error, app_commands.CheckFailure):
+        # Permission checks (e.g. coach_check) carry their own message
+        embed = create_error_embed(str(error))
+    else:
+        logger.error('Erreur dans la commande %s', interaction.command and interaction.command.name, exc_info=error)
+        embed = create_error_embed(UNEXPECTED_ERROR_MESSAGE)
+
+    try:
+        if interaction.response.is_done():
+            await interaction.followup.send(embed=embed, ephemeral=True)
+        else:
+            await interaction.response.send_message(embed=embed, ephemeral=True)
+    except discord.HTTPException as e:
+        logger.debug("Impossible d'envoyer le message d'erreur: %s", e)
+
+
+def precompile_packages():
+    """
+    Compile the bot packages to bytecode so loading the cogs only unmarshals .pyc files
+    """
+    for package in BOT_PACKAGES:
+        compileall.compile_dir(os.path.join(BASE_DIR, package), quiet=1)
+
+
 async def load_cogs():
     """
-    Load all cogs
+    Load all cogs concurrently
     """
-    for cog in COGS:
-        try:
-            await bot.load_extension(cog)
-            print(f'✅ Cog chargé: {cog}')
-        except Exception as e:
-            print(f'❌ Erreur lors du chargement de {cog}:')
-            traceback.print_exception(type(e), e, e.__traceback__)
+    results = await asyncio.gather(
+        *(bot.load_extension(cog) for cog in COGS),
+        return_exceptions=True
+    )
+    for cog, result in zip(COGS, results):
+        if isinstance(result, BaseException):
+            logger.error('❌ Erreur lors du chargement de %s', cog, exc_info=result)
+        else:
+            logger.info('✅ Cog chargé: %s', cog)
 
 
 async def main():
     """
     Main async function to start the bot
     """
-    # Validate configuration
+    # Validate configuration (synchronous helpers run in a worker thread)
     try:
-        config.validate_config()
+        await asyncio.to_thread(config.validate_config)
     except ValueError as e:
-        print(f"\n❌ Erreur de configuration:\n{e}\n")
+        logger.error("❌ Erreur de configuration:\n%s", e)
         sys.exit(1)
 
-    # Initialize database
-    try:
-        init_db()
-        print("✅ Base de données initialisée\n")
-    except Exception as e:
-        print(f"❌ Erreur lors de l'initialisation de la base de données:")
-        traceback.print_exception(type(e), e, e.__traceback__)
-        sys.exit(1)
+    # Initialize database in a worker thread while the bot logs in and loads the cogs
+    # (imported here so SQLAlchemy is only loaded once config is valid)
+    from database import init_db
+    db_task = asyncio.create_task(asyncio.to_thread(init_db))
 
-    # Load cogs
     async with bot:
-        await load_cogs()
+        # Keep connections to Discord's API hosts alive and reuse them across bursts of commands
+        # (the HTTP session is created by login(), so the connector must be set before it)
+        bot.http.connector = aiohttp.TCPConnector(
+            limit=HTTP_CONNECTION_LIMIT,
+            limit_per_host=HTTP_CONNECTION_LIMIT_PER_HOST,
+            ttl_dns_cache=300,
+            keepalive_timeout=75
+        )
 
-        # Start the bot
+        # Log in (runs setup_hook, which loads the cogs and starts the command sync)
         try:
-            await bot.start(config.DISCORD_TOKEN)
+            await bot.login(config.DISCORD_TOKEN)
         except discord.LoginFailure:
-            print("\n❌ Token Discord invalide. Vérifiez votre fichier .env\n")
+            logger.error("❌ Token Discord invalide. Vérifiez votre fichier .env")
+            sys.exit(1)
+        except Exception:
+            logger.exception("❌ Erreur lors du démarrage du bot")
+            sys.exit(1)
+
+        # The gateway only connects once the database is ready for the cogs
+        try:
+            await db_task
+            logger.info("✅ Base de données initialisée")
+        except Exception:
+            logger.exception("❌ Erreur lors de l'initialisation de la base de données")
             sys.exit(1)
-        except Exception as e:
-            print(f"\n❌ Erreur lors du démarrage du bot:")
-            traceback.print_exception(type(e), e, e.__traceback__)
+
+        try:
+            await bot.connect()
+        except Exception:
+            logger.exception("❌ Erreur lors du démarrage du bot")
             sys.exit(1)
 
 
 if __name__ == "__main__":
+    log_listener = setup_logging()
+    install_event_loop_policy()
     try:
         asyncio.run(main())
     except KeyboardInterrupt:
-        print("\n\n👋 Arrêt du bot...\n")
+        logger.info("👋 Arrêt du bot...")
         sys.exit(0)
+    finally:
+        log_listener.stop()
@@ -4,13 +4,90 @@ Admin Cog - Admin and coach commands for managing bookings
 import discord
 from discord.ext import commands
 from discord import app_commands
-from datetime import datetime, timedelta
-from typing import Optional
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+import itertools
+import re
+from sqlalchemy import delete, func, select, update
 import config
-from database import get_session, Booking, Client
+from database import get_async_session, check_async_db, get_client_id, invalidate_client_id, Booking, Client, Feedback
 from utils.embeds import create_error_embed, create_success_embed, create_info_embed
-from utils.permissions import coach_only, is_coach
+from utils.permissions import coach_check, coach_only
 from utils.google_calendar import GoogleCalendarManager
+from utils.users import get_or_fetch_user
+
+_STATUS_EMOJI = {
+    config.STATUS_CONFIRMED: "✅",
+    config.STATUS_COMPLETED: "✔️",
+    config.STATUS_CANCELLED: "❌",
+    config.STATUS_NO_SHOW: "👻"
+}
+_TYPE_EMOJI = {config.BOOKING_TYPE_FREE: "🆓"}
+
+# /booking action -> (new status, confirmation label, notify the client)
+_STATUS_ACTIONS = {
+    "cancel": (config.STATUS_CANCELLED, "annulée. Le client a été notifié.", True),
+    "complete": (config.STATUS_COMPLETED, "marquée comme complétée.", False),
+    "noshow": (config.STATUS_NO_SHOW, "marquée comme no-show.", False),
+}
+
+
+# Same inputs as strptime("%d/%m/%Y %H:%M"), without re-parsing the format on every call
+_SESSION_DATE_RE = re.compile(r"(\d{1,2})/(\d{1,2})/(\d{4}) (\d{1,2}):(\d{1,2})")
+
+
+def _parse_session_date(line: str) -> datetime:
+    """
+    Parse a naive datetime in format DD/MM/YYYY HH:MM
+
+    Raises:
+        ValueError: if the line doesn't match or isn't a valid date
+    """
+    match = _SESSION_DATE_RE.fullmatch(line)
+    if not match:
+        raise ValueError(line)
+    day, month, year, hour, minute = map(int, match.groups())
+    return datetime(year, month, day, hour, minute)
+
+
+def _parse_session_dates(sessions_text: str, quantity: int, now: datetime) -> List[datetime]:
+    """
+    Parse one "JJ/MM/AAAA HH:MM" date per line into timezone-aware datetimes
+
+    Raises:
+        ValueError: with a user-facing message if the line count, a format
+            or a date in the past is invalid
+    """
+    session_lines = [line.strip() for line in sessions_text.strip().split('\n') if line.strip()]
+
+    if len(session_lines) != quantity:
+        raise ValueError(
+            f"Vous devez entrer exactement {quantity} session{'s' if quantity > 1 else ''}.\n"
+            f"Vous avez entré {len(session_lines)} ligne{'s' if len(session_lines) > 1 else ''}."
+        )
+
+    session_dates = []
+    for line in session_lines:
+        try:
+            dt = _parse_session_date(line)
+        except ValueError:
+            raise ValueError(
+                f"Format de date invalide: `{line}`\n\n"
+                f"Format attendu: JJ/MM/AAAA HH:MM\n"
+                f"Exemple: 15/02/2026 14:00"
+            ) from None
+        # Add timezone
+        session_dates.append(dt.replace(tzinfo=config.TIMEZONE))
+
+    # Check for past dates
+    past_date = next((dt for dt in session_dates if dt < now), None)
+    if past_date:
+        raise ValueError(
+            f"Date dans le passé: {past_date.strftime('%d/%m/%Y %H:%M')}\n\n"
+            f"Toutes les dates doivent être dans le futur."
+        )
+
+    return session_dates
 
 
 class Admin(commands.Cog):
@@ -27,6 +104,30 @@ class Admin(commands.Cog):
         Called when the cog is loaded
         """
         print("⚙️ Admin cog loaded")
+        try:
+            print(f"🗄️ Pool de connexions prêt: {await check_async_db()}")
+        except Exception as e:
+            print(f"❌ Base de données injoignable: {e}")
+
+    @app_commands.command(name="db-pool", description="[Coach] État du pool de connexions à la base de données")
+    @coach_check()
+    async def db_pool(self, interaction: discord.Interaction):
+        """
+        Show the async connection pool status
+        """
+        try:
+            status = await check_async_db()
+        except Exception as e:
+            await interaction.response.send_message(
+                embed=create_error_embed(f"Base de données injoignable: `{e}`"),
+                ephemeral=True
+            )
+            return
+
+        await interaction.response.send_message(
+            embed=create_info_embed(f"`{status}`", title="🗄️ Pool de connexions"),
+            ephemeral=True
+        )
 
     @app_commands.command(name="planning", description="[Coach] Afficher le planning")
     @app_commands.describe(
@@ -38,6 +139,7 @@ class Admin(commands.Cog):
         app_commands.Choice(name="Cette semaine", value="week"),
         app_commands.Choice(name="Ce mois", value="month")
     ])
+    @coach_check()
     async def planning(
         self,
         interaction: discord.Interaction,
@@ -47,13 +149,6 @@ class Admin(commands.Cog):
         """
         Display planning for coaches
         """
-        if not is_coach(interaction.user) and not interaction.user.guild_permissions.administrator:
-            await interaction.response.send_message(
-                embed=create_error_embed("Vous devez être coach pour utiliser cette commande."),
-                ephemeral=True
-            )
-            return
-
         await interaction.response.defer()
 
         now = datetime.now(config.TIMEZONE)
@@ -74,23 +169,29 @@ class Admin(commands.Cog):
             end_date = next_month.replace(day=1) - timedelta(seconds=1)
             title = f"📅 Planning de {now.strftime('%B %Y')}"
 
-        # Get bookings
-        with get_session() as session:
-            query = session.query(Booking).filter(
+        # Get the rendered booking columns with their client name in a single JOIN
+        async with get_async_session() as session:
+            query = select(
+                Booking.scheduled_at,
+                Booking.duration_minutes,
+                Booking.booking_type,
+                Booking.status,
+                Client.discord_name
+            ).join(Client, Client.id == Booking.client_id).where(
                 Booking.scheduled_at >= start_date,
                 Booking.scheduled_at <= end_date
             )
 
             # Filter by user if specified
             if user:
-                client = session.query(Client).filter_by(discord_id=str(user.id)).first()
-                if client:
-                    query = query.filter(Booking.client_id == client.id)
+                client_id = await get_client_id(session, str(user.id))
+                if client_id:
+                    query = query.where(Booking.client_id == client_id)
                     title += f" - {user.display_name}"
 
-            bookings = query.order_by(Booking.scheduled_at).all()
+            rows = (await session.execute(query.order_by(Booking.scheduled_at))).all()
 
-            if not bookings:
+            if not rows:
                 embed = create_info_embed(
                     "Aucune réservation pour cette période.",
                     title=title
@@ -101,41 +202,26 @@ class Admin(commands.Cog):
             # Create embed
             embed = discord.Embed(
                 title=title,
-                description=f"**{len(bookings)}** session(s) prévue(s)",
+                description=f"**{len(rows)}** session(s) prévue(s)",
                 color=config.BOT_COLOR
             )
 
-            # Group by date
-            bookings_by_date = {}
-            for booking in bookings:
-                date_key = booking.scheduled_at.strftime("%d/%m/%Y")
-                if date_key not in bookings_by_date:
-                    bookings_by_date[date_key] = []
-                bookings_by_date[date_key].append(booking)
-
-            # Add fields for each date
-            for date_key, day_bookings in bookings_by_date.items():
-                field_value = ""
-                for booking in day_bookings:
-                    client = session.query(Client).filter_by(id=booking.client_id).first()
-                    if client:
-                        type_emoji = "🆓" if booking.booking_type == config.BOOKING_TYPE_FREE else "💰"
-                        status_emoji = {
-                            config.STATUS_CONFIRMED: "✅",
-                            config.STATUS_COMPLETED: "✔️",
-                            config.STATUS_CANCELLED: "❌",
-                            config.STATUS_NO_SHOW: "👻"
-                        }.get(booking.status, "❓")
-
-                        field_value += f"{status_emoji} {type_emoji} **{booking.scheduled_at.strftime('%H:%M')}** - {client.discord_name} ({booking.duration_minutes}min)\n"
+            # Rows are sorted by scheduled_at, so consecutive rows share a date
+            for date_key, day_rows in itertools.groupby(rows, key=lambda row: row.scheduled_at.date()):
+                parts = []
+                for scheduled_at, duration, booking_type, status, client_name in day_rows:
+                    type_emoji = _TYPE_EMOJI.get(booking_type, "💰")
+                    status_emoji = _STATUS_EMOJI.get(status, "❓")
+
+                    parts.append(f"{status_emoji} {type_emoji} **{scheduled_at.strftime('%H:%M')}** - {client_name} ({duration}min)")
 
                 embed.add_field(
-                    name=f"📆 {date_key}",
-                    value=field_value or "Aucune session",
+                    name=f"📆 {date_key.strftime('%d/%m/%Y')}",
+                    value="\n".join(parts) or "Aucune session",
                     inline=False
                 )
 
-            embed.timestamp = datetime.utcnow()
+            embed.timestamp = now
             await interaction.followup.send(embed=embed, ephemeral=True)
 
     @app_commands.command(name="booking", description="[Coach] Gérer une réservation")
@@ -149,6 +235,7 @@ class Admin(commands.Cog):
         app_commands.Choice(name="Marquer comme no-show", value="noshow"),
         app_commands.Choice(name="Voir détails", value="view")
     ])
+    @coach_check()
     async def booking(
         self,
         interaction: discord.Interaction,
@@ -158,28 +245,20 @@ class Admin(commands.Cog):
         """
         Manage a booking
         """
-        if not is_coach(interaction.user) and not interaction.user.guild_permissions.administrator:
-            await interaction.response.send_message(
-                embed=create_error_embed("Vous devez être coach pour utiliser cette commande."),
-                ephemeral=True
-            )
-            return
-
         await interaction.response.defer()
 
-        with get_session() as session:
-            booking = session.query(Booking).filter_by(id=booking_id).first()
+        not_found_embed = create_error_embed(f"Aucune réservation trouvée avec l'ID `{booking_id}`.")
 
-            if not booking:
-                await interaction.followup.send(
-                    embed=create_error_embed(f"Aucune réservation trouvée avec l'ID `{booking_id}`."),
-                    ephemeral=True
-                )
-                return
+        async with get_async_session() as session:
+            if action == "view":
+                booking = await session.get(Booking, booking_id)
 
-            client = session.query(Client).filter_by(id=booking.client_id).first()
+                if not booking:
+                    await interaction.followup.send(embed=not_found_embed, ephemeral=True)
+                    return
+
+                client = await session.get(Client, booking.client_id)
 
-            if action == "view":
                 # Show booking details
                 type_label = "Coaching Gratuit" if booking.booking_type == config.BOOKING_TYPE_FREE else "Coaching Payant"
                 embed = discord.Embed(
@@ -193,20 +272,42 @@ class Admin(commands.Cog):
                 embed.add_field(name="📊 Statut", value=booking.status, inline=True)
                 if booking.notes:
                     embed.add_field(name="📝 Notes", value=booking.notes, inline=False)
-                embed.timestamp = datetime.utcnow()
+                embed.timestamp = datetime.now(timezone.utc)
                 await interaction.followup.send(embed=embed)
+                return
 
-            elif action == "cancel":
-                booking.status = config.STATUS_CANCELLED
-                session.commit()
+            # Status change: a single UPDATE ... RETURNING, no SELECT beforehand
+            new_status, done_label, notify_client = _STATUS_ACTIONS[action]
+            updated = (await session.execute(
+                update(Booking)
+                .where(Booking.id == booking_id)
+                .values(status=new_status)
+                .returning(Booking.client_id, Booking.scheduled_at),
+                execution_options={"synchronize_session": False}
+            )).first()
+
+            if not updated:
+                await interaction.followup.send(embed=not_found_embed, ephemeral=True)
+                return
+
+            await session.commit()
+            client_id, scheduled_at = updated
+            if new_status == config.STATUS_CANCELLED:
+                self.bot.dispatch("booking_cancelled", booking_id)
+            else:
+                self.bot.dispatch("booking_status_changed", booking_id, new_status)
 
-                # Notify client
-                if client:
+            # Notify client
+            if notify_client:
+                discord_id = (await session.execute(
+                    select(Client.discord_id).where(Client.id == client_id)
+                )).scalar_one_or_none()
+                if discord_id:
                     try:
-                        user = await self.bot.fetch_user(int(client.discord_id))
+                        user = await get_or_fetch_user(self.bot, int(discord_id))
                         embed = discord.Embed(
                             title="❌ Réservation annulée",
-                            description=f"Votre session du {booking.scheduled_at.strftime('%d/%m/%Y à %H:%M')} a été annulée par votre coach.",
+                            description=f"Votre session du {scheduled_at.strftime('%d/%m/%Y à %H:%M')} a été annulée par votre coach.",
                             color=config.ERROR_COLOR
                         )
                         embed.add_field(name="🆔 ID", value=f"`{booking_id}`", inline=False)
@@ -215,23 +316,9 @@ class Admin(commands.Cog):
                     except:
                         pass
 
-                await interaction.followup.send(
-                    embed=create_success_embed(f"Réservation #{booking_id} annulée. Le client a été notifié.")
-                )
-
-            elif action == "complete":
-                booking.status = config.STATUS_COMPLETED
-                session.commit()
-                await interaction.followup.send(
-                    embed=create_success_embed(f"Réservation #{booking_id} marquée comme complétée.")
-                )
-
-            elif action == "noshow":
-                booking.status = config.STATUS_NO_SHOW
-                session.commit()
-                await interaction.followup.send(
-                    embed=create_success_embed(f"Réservation #{booking_id} marquée comme no-show.")
-                )
+            await interaction.followup.send(
+                embed=create_success_embed(f"Réservation #{booking_id} {done_label}")
+            )
 
     @app_commands.command(name="my-sessions", description="Voir vos prochaines sessions de coaching")
     async def my_sessions(self, interaction: discord.Interaction):
@@ -240,10 +327,10 @@ class Admin(commands.Cog):
         """
         await interaction.response.defer(ephemeral=True)
 
-        with get_session() as session:
-            client = session.query(Client).filter_by(discord_id=str(interaction.user.id)).first()
+        async with get_async_session() as session:
+            client_id = await get_client_id(session, str(interaction.user.id))
 
-            if not client:
+            if not client_id:
                 await interaction.followup.send(
                     embed=create_info_embed("Vous n'avez aucune réservation pour le moment.\n\nUtilisez le bouton de réservation pour créer une session."),
                     ephemeral=True
@@ -251,23 +338,32 @@ class Admin(commands.Cog):
                 return
 
             now = datetime.now(config.TIMEZONE)
-            all_bookings = session.query(Booking).filter_by(client_id=client.id).all()
+
+            # Per-status counts in a single GROUP BY
+            status_counts = dict((await session.execute(
+                select(Booking.status, func.count())
+                .where(Booking.client_id == client_id)
+                .group_by(Booking.status)
+            )).all())
 
             # Upcoming confirmed sessions
-            upcoming = []
-            for b in all_bookings:
-                scheduled = b.scheduled_at
-                if scheduled.tzinfo is None:
-                    scheduled = config.TIMEZONE.localize(scheduled)
-                if b.status == config.STATUS_CONFIRMED and scheduled > now:
-                    upcoming.append((b, scheduled))
-            upcoming.sort(key=lambda x: x[1])
+            upcoming_filter = (
+                Booking.client_id == client_id,
+                Booking.status == config.STATUS_CONFIRMED,
+                Booking.scheduled_at > now
+            )
+            upcoming_count = (await session.execute(
+                select(func.count()).select_from(Booking).where(*upcoming_filter)
+            )).scalar_one()
+            upcoming = (await session.execute(
+                select(Booking.id, Booking.scheduled_at, Booking.duration_minutes, Booking.booking_type)
+                .where(*upcoming_filter)
+                .order_by(Booking.scheduled_at)
+                .limit(5)
+            )).all()
 
             # Pack sessions to schedule
-            pending = [b for b in all_bookings if b.status == "pending_schedule"]
-
-            # Recent completed
-            completed = [b for b in all_bookings if b.status == config.STATUS_COMPLETED]
+            pending_count = status_counts.get(config.STATUS_PENDING_SCHEDULE, 0)
 
             embed = discord.Embed(
                 title="📅 Mes sessions de coaching",
@@ -276,29 +372,30 @@ class Admin(commands.Cog):
             )
 
             if upcoming:
-                upcoming_text = ""
-                for booking, scheduled in upcoming[:5]:
-                    type_emoji = "🆓" if booking.booking_type == config.BOOKING_TYPE_FREE else "💰"
-                    upcoming_text += f"{type_emoji} **{scheduled.strftime('%d/%m/%Y à %H:%M')}** ({booking.duration_minutes}min) — ID: `{booking.id}`\n"
-                embed.add_field(name=f"⏳ Prochaines sessions ({len(upcoming)})", value=upcoming_text, inline=False)
+                upcoming_lines = []
+                for booking_id, scheduled_at, duration, booking_type in upcoming:
+                    type_emoji = _TYPE_EMOJI.get(booking_type, "💰")
+                    upcoming_lines.append(f"{type_emoji} **{scheduled_at.strftime('%d/%m/%Y à %H:%M')}** ({duration}min) — ID: `{booking_id}`")
+                upcoming_text = "\n".join(upcoming_lines)
+                embed.add_field(name=f"⏳ Prochaines sessions ({upcoming_count})", value=upcoming_text, inline=False)
             else:
                 embed.add_field(name="⏳ Prochaines sessions", value="Aucune session prévue.", inline=False)
 
-            if pending:
+            if pending_count:
                 embed.add_field(
-                    name=f"📋 Sessions à planifier ({len(pending)})",
-                    value=f"Vous avez **{len(pending)}** séance(s) de pack en attente de planification.\nContactez votre coach pour les programmer.",
+                    name=f"📋 Sessions à planifier ({pending_count})",
+                    value=f"Vous avez **{pending_count}** séance(s) de pack en attente de planification.\nContactez votre coach pour les programmer.",
                     inline=False
                 )
 
             embed.add_field(
                 name="📊 Historique",
-                value=f"✅ Complétées: **{len(completed)}** | ❌ Annulées: **{len([b for b in all_bookings if b.status == config.STATUS_CANCELLED])}**",
+                value=f"✅ Complétées: **{status_counts.get(config.STATUS_COMPLETED, 0)}** | ❌ Annulées: **{status_counts.get(config.STATUS_CANCELLED, 0)}**",
                 inline=False
             )
 
             embed.set_footer(text="Utilisez le bouton de réservation pour créer une nouvelle session")
-            embed.timestamp = datetime.utcnow()
+            embed.timestamp = now
             await interaction.followup.send(embed=embed, ephemeral=True)
 
     @app_commands.command(name="add-sessions", description="[Coach] Ajouter des sessions manuellement pour un client")
@@ -321,6 +418,7 @@ class Admin(commands.Cog):
             app_commands.Choice(name="💰 Payant", value="payant"),
         ]
     )
+    @coach_check()
     async def add_sessions(
         self,
         interaction: discord.Interaction,
@@ -331,13 +429,6 @@ class Admin(commands.Cog):
         """
         Manually add multiple sessions for a client
         """
-        if not is_coach(interaction.user) and not interaction.user.guild_permissions.administrator:
-            await interaction.response.send_message(
-                embed=create_error_embed("Vous devez être coach pour utiliser cette commande."),
-                ephemeral=True
-            )
-            return
-
         # Show modal to get session details
         modal = AddSessionsModal(
             cog=self,
@@ -358,6 +449,7 @@ class Admin(commands.Cog):
         app_commands.Choice(name="Annulées seulement", value="cancelled"),
         app_commands.Choice(name="À planifier (packs) seulement", value="pending_schedule"),
     ])
+    @coach_check()
     async def clear_bookings(
         self,
         interaction: discord.Interaction,
@@ -367,54 +459,56 @@ class Admin(commands.Cog):
         """
         Delete bookings from DB and their Google Calendar events
         """
-        if not is_coach(interaction.user) and not interaction.user.guild_permissions.administrator:
-            await interaction.response.send_message(
-                embed=create_error_embed("Vous devez être coach pour utiliser cette commande."),
-                ephemeral=True
-            )
-            return
-
         await interaction.response.defer(ephemeral=True)
 
-        with get_session() as session:
-            query = session.query(Booking)
+        async with get_async_session() as session:
+            query = select(Booking.id, Booking.google_event_id)
 
             if user:
-                client = session.query(Client).filter_by(discord_id=str(user.id)).first()
-                if not client:
-                    await interaction.followup.send(
-                        embed=create_error_embed(f"{user.mention} n'a aucune réservation en base."),
-                        ephemeral=True
-                    )
-                    return
-                query = query.filter(Booking.client_id == client.id)
+                query = query.join(Client, Client.id == Booking.client_id).where(
+                    Client.discord_id == str(user.id)
+                )
 
             if status != "all":
-                query = query.filter(Booking.status == status)
+                query = query.where(Booking.status == status)
 
-            bookings = query.all()
+            rows = (await session.execute(query)).all()
 
-            if not bookings:
+            if not rows:
+                # Tell apart an unknown client only when nothing matched
+                if user and not await get_client_id(session, str(user.id)):
+                    message = f"{user.mention} n'a aucune réservation en base."
+                else:
+                    message = "Aucune réservation trouvée avec ces critères."
                 await interaction.followup.send(
-                    embed=create_error_embed("Aucune réservation trouvée avec ces critères."),
+                    embed=create_error_embed(message),
                     ephemeral=True
                 )
                 return
 
-            deleted_cal = 0
-            failed_cal = 0
-            for booking in bookings:
-                if booking.google_event_id:
-                    success = self.calendar_manager.delete_event(booking.google_event_id)
-                    if success:
-                        deleted_cal += 1
-                    else:
-                        failed_cal += 1
-
-            count = len(bookings)
-            for booking in bookings:
-                session.delete(booking)
-            session.commit()
+            # Delete the calendar events in batches, off the event loop
+            event_ids = [event_id for _, event_id in rows if event_id]
+            deleted_cal, failed_cal = await self.calendar_manager.run(
+                self.calendar_manager.delete_events, event_ids
+            ) if event_ids else (0, 0)
+            if deleted_cal:
+                self.calendar_manager.invalidate_slots()
+
+            # Bulk DELETE bypasses the ORM cascade, so remove the feedbacks explicitly first
+            booking_ids = [booking_id for booking_id, _ in rows]
+            count = len(booking_ids)
+            await session.execute(
+                delete(Feedback).where(Feedback.booking_id.in_(booking_ids)),
+                execution_options={"synchronize_session": False}
+            )
+            await session.execute(
+                delete(Booking).where(Booking.id.in_(booking_ids)),
+                execution_options={"synchronize_session": False}
+            )
+            await session.commit()
+
+        for booking_id in booking_ids:
+            self.bot.dispatch("booking_cancelled", booking_id)
 
         user_label = user.mention if user else "tous les utilisateurs"
         status_label = {"all": "toutes", "confirmed": "confirmées", "cancelled": "annulées", "pending_schedule": "à planifier"}.get(status, status)
@@ -428,7 +522,7 @@ class Admin(commands.Cog):
             value=f"✅ {deleted_cal} événement(s) supprimé(s)" + (f"\n⚠️ {failed_cal} échec(s)" if failed_cal else ""),
             inline=False
         )
-        embed.timestamp = datetime.utcnow()
+        embed.timestamp = datetime.now(timezone.utc)
         await interaction.followup.send(embed=embed, ephemeral=True)
 
 
@@ -485,6 +579,8 @@ class AddSessionsModal(discord.ui.Modal):
         try:
             # Parse duration
             duration = int(self.duration_input.value.strip())
+            if duration <= 0:
+                raise ValueError(duration)
         except ValueError:
             await interaction.followup.send(
                 embed=create_error_embed("Durée invalide. Veuillez entrer un nombre."),
@@ -492,90 +588,62 @@ class AddSessionsModal(discord.ui.Modal):
             )
             return
 
-        # Parse session dates/times
-        sessions_text = self.sessions_input.value.strip()
-        session_lines = [line.strip() for line in sessions_text.split('\n') if line.strip()]
+        # Parse and validate every line before any Calendar or DB work,
+        # so a bad line never leaves orphaned events behind
+        now = datetime.now(config.TIMEZONE)
+        try:
+            session_dates = _parse_session_dates(self.sessions_input.value, self.quantity, now)
+        except ValueError as e:
+            await interaction.followup.send(embed=create_error_embed(str(e)), ephemeral=True)
+            return
+
+        notes = self.notes_input.value.strip() or None
+
+        # Create all Google Calendar events in a single batched request
+        event_ids = await self.cog.calendar_manager.run(
+            self.cog.calendar_manager.create_booking_events,
+            session_dates,
+            duration,
+            self.booking_type,
+            self.client_user.display_name,
+            str(self.client_user.id),
+            notes
+        )
 
-        if len(session_lines) != self.quantity:
+        failed = [dt for dt, event_id in zip(session_dates, event_ids) if not event_id]
+        if failed:
+            # Roll back the events that were created so the calendar stays consistent
+            created_ids = [event_id for event_id in event_ids if event_id]
+            if created_ids:
+                await self.cog.calendar_manager.run(self.cog.calendar_manager.delete_events, created_ids)
             await interaction.followup.send(
                 embed=create_error_embed(
-                    f"Vous devez entrer exactement {self.quantity} session{'s' if self.quantity > 1 else ''}.\n"
-                    f"Vous avez entré {len(session_lines)} ligne{'s' if len(session_lines) > 1 else ''}."
+                    f"Erreur lors de la création de l'événement Google Calendar pour {failed[0].strftime('%d/%m/%Y %H:%M')}"
                 ),
                 ephemeral=True
             )
             return
-
-        # Parse dates
-        session_dates = []
-        for line in session_lines:
-            try:
-                # Parse date in format DD/MM/YYYY HH:MM
-                dt = datetime.strptime(line, "%d/%m/%Y %H:%M")
-                # Add timezone
-                dt = config.TIMEZONE.localize(dt)
-                session_dates.append(dt)
-            except ValueError:
-                await interaction.followup.send(
-                    embed=create_error_embed(
-                        f"Format de date invalide: `{line}`\n\n"
-                        f"Format attendu: JJ/MM/AAAA HH:MM\n"
-                        f"Exemple: 15/02/2026 14:00"
-                    ),
-                    ephemeral=True
-                )
-                return
-
-        # Check for past dates
-        now = datetime.now(config.TIMEZONE)
-        for dt in session_dates:
-            if dt < now:
-                await interaction.followup.send(
-                    embed=create_error_embed(
-                        f"Date dans le passé: {dt.strftime('%d/%m/%Y %H:%M')}\n\n"
-                        f"Toutes les dates doivent être dans le futur."
-                    ),
-                    ephemeral=True
-                )
-                return
+        for session_date in session_dates:
+            self.cog.calendar_manager.invalidate_slots(session_date)
 
         # Get or create client
-        with get_session() as session:
-            client = session.query(Client).filter_by(discord_id=str(self.client_user.id)).first()
+        async with get_async_session() as session:
+            client_id = await get_client_id(session, str(self.client_user.id))
 
-            if not client:
+            if not client_id:
                 client = Client(
                     discord_id=str(self.client_user.id),
                     discord_name=self.client_user.display_name
                 )
                 session.add(client)
-                session.flush()
+                await session.flush()
+                client_id = client.id
+                invalidate_client_id(client.discord_id)
 
             # Create bookings
-            created_bookings = []
-            notes = self.notes_input.value.strip() or None
-
-            for dt in session_dates:
-                # Create Google Calendar event
-                event_id = self.cog.calendar_manager.create_event(
-                    title=f"Coaching - {self.client_user.display_name}",
-                    start_time=dt,
-                    duration_minutes=duration,
-                    description=f"Type: {self.booking_type}\nClient: {self.client_user.display_name}\nNotes: {notes or 'Aucune'}"
-                )
-
-                if not event_id:
-                    await interaction.followup.send(
-                        embed=create_error_embed(
-                            f"Erreur lors de la création de l'événement Google Calendar pour {dt.strftime('%d/%m/%Y %H:%M')}"
-                        ),
-                        ephemeral=True
-                    )
-                    return
-
-                # Create booking in database
-                booking = Booking(
-                    client_id=client.id,
+            created_bookings = [
+                Booking(
+                    client_id=client_id,
                     google_event_id=event_id,
                     booking_type=self.booking_type,
                     scheduled_at=dt,
@@ -583,28 +651,32 @@ class AddSessionsModal(discord.ui.Modal):
                     status=config.STATUS_CONFIRMED,
                     notes=notes
                 )
-                session.add(booking)
-                created_bookings.append(booking)
+                for dt, event_id in zip(session_dates, event_ids)
+            ]
+            session.add_all(created_bookings)
+            await session.commit()
 
-            session.commit()
+            for booking in created_bookings:
+                self.cog.bot.dispatch("booking_scheduled", booking.id, booking.scheduled_at)
 
             # Create success embed
-            type_emoji = "🆓" if self.booking_type == config.BOOKING_TYPE_FREE else "💰"
+            type_emoji = _TYPE_EMOJI.get(self.booking_type, "💰")
             embed = discord.Embed(
                 title=f"✅ {len(created_bookings)} session{'s' if len(created_bookings) > 1 else ''} créée{'s' if len(created_bookings) > 1 else ''}",
                 description=f"Sessions ajoutées pour {self.client_user.mention}",
                 color=config.SUCCESS_COLOR
             )
 
-            sessions_list = ""
-            for booking in created_bookings:
-                sessions_list += f"{type_emoji} {booking.scheduled_at.strftime('%d/%m/%Y à %H:%M')} ({duration}min) - ID: `{booking.id}`\n"
+            sessions_list = "\n".join(
+                f"{type_emoji} {booking.scheduled_at.strftime('%d/%m/%Y à %H:%M')} ({duration}min) - ID: `{booking.id}`"
+                for booking in created_bookings
+            )
 
             embed.add_field(name="📅 Sessions", value=sessions_list, inline=False)
             if notes:
                 embed.add_field(name="📝 Notes", value=notes, inline=False)
 
-            embed.timestamp = datetime.utcnow()
+            embed.timestamp = now
 
             await interaction.followup.send(embed=embed, ephemeral=True)
 
@@ -4,13 +4,48 @@ Analytics Cog - Global statistics and data export for coaches
 import discord
 from discord.ext import commands
 from discord import app_commands
+from collections import Counter
 from datetime import datetime, timedelta
+from typing import Optional, Tuple
+import asyncio
 import csv
 import io
+from sqlalchemy import case, desc, distinct, func
 import config
 from database import get_session, Booking, Client, Feedback
+from database.cache import TTLCache
 from utils.embeds import create_error_embed
-from utils.permissions import is_coach
+from utils.formatting import fmt_dt
+from utils.permissions import coach_check
+
+ANALYTICS_CACHE_TTL = 60  # seconds
+# Statuses that count as a session held (or about to be) by a client
+ACTIVE_STATUSES = frozenset({config.STATUS_CONFIRMED, config.STATUS_COMPLETED})
+
+# Embed field bodies, filled with str.format_map(data)
+SESSIONS_TMPL = (
+    "**Total:** {total}\n"
+    "✅ Complétées: **{completed}**\n"
+    "⏳ Confirmées (à venir): **{confirmed}**\n"
+    "📋 À planifier (packs): **{pending}**\n"
+    "❌ Annulées: **{cancelled}**\n"
+    "👻 No-show: **{no_shows}**"
+)
+RATES_TMPL = (
+    "✅ Complétion: **{completion_rate:.1f}%**\n"
+    "❌ Annulation: **{cancellation_rate:.1f}%**\n"
+    "👻 No-show: **{no_show_rate:.1f}%**"
+)
+TYPES_TMPL = (
+    "🆓 Gratuit: **{free_sessions}**\n"
+    "💰 Payant: **{paid_sessions}**"
+)
+CLIENTS_TMPL = (
+    "Actifs: **{active_clients}**\n"
+    "Nouveaux: **{new_clients}**"
+)
+HOURS_TMPL = "**{total_hours}h{extra_minutes:02d}** ({total_minutes} min)"
+RATING_TMPL = "{stars}\n**{avg_rating:.1f}/5** ({feedback_count} avis)"
 
 
 class Analytics(commands.Cog):
@@ -20,10 +55,33 @@ class Analytics(commands.Cog):
 
     def __init__(self, bot):
         self.bot = bot
+        # period -> computed analytics, absorbs repeated refreshes of the same view
+        self._cache = TTLCache(maxsize=8, ttl=ANALYTICS_CACHE_TTL)
 
     async def cog_load(self):
         print("📈 Analytics cog loaded")
 
+    @commands.Cog.listener()
+    async def on_booking_scheduled(self, booking_id: int, scheduled_at: datetime):
+        """
+        Drop cached analytics when a booking is created or rescheduled
+        """
+        self._cache.clear()
+
+    @commands.Cog.listener()
+    async def on_booking_cancelled(self, booking_id: int):
+        """
+        Drop cached analytics when a booking is cancelled or deleted
+        """
+        self._cache.clear()
+
+    @commands.Cog.listener()
+    async def on_booking_status_changed(self, booking_id: int, status: str):
+        """
+        Drop cached analytics when a booking is completed or marked no-show
+        """
+        self._cache.clear()
+
     @app_commands.command(name="analytics", description="[Coach] Voir les statistiques globales du coaching")
     @app_commands.describe(period="Période à analyser")
     @app_commands.choices(period=[
@@ -32,17 +90,11 @@ class Analytics(commands.Cog):
         app_commands.Choice(name="Les 3 derniers mois", value="quarter"),
         app_commands.Choice(name="Tout le temps", value="all"),
     ])
+    @coach_check()
     async def analytics(self, interaction: discord.Interaction, period: str = "month"):
         """
         Display global coaching analytics
         """
-        if not is_coach(interaction.user) and not interaction.user.guild_permissions.administrator:
-            await interaction.response.send_message(
-                embed=create_error_embed("Vous devez être coach pour utiliser cette commande."),
-                ephemeral=True
-            )
-            return
-
         await interaction.response.defer(ephemeral=True)
 
         now = datetime.now(config.TIMEZONE)
@@ -60,24 +112,84 @@ class Analytics(commands.Cog):
             start_date = None
             period_label = "Tout le temps"
 
+        data = self._cache.get(period)
+        if data is None:
+            # Blocking queries run on a worker thread so the gateway keeps being serviced
+            data = await asyncio.to_thread(self._compute_analytics, start_date, now)
+            self._cache.set(period, data)
+
+        # Build embed
+        embed = discord.Embed(
+            title=f"📈 Analytics — {period_label}",
+            color=config.BOT_COLOR
+        )
+
+        embed.add_field(name="📊 Sessions", value=SESSIONS_TMPL.format_map(data), inline=True)
+        embed.add_field(name="📉 Taux", value=RATES_TMPL.format_map(data), inline=True)
+        embed.add_field(name="💰 Types", value=TYPES_TMPL.format_map(data), inline=True)
+        embed.add_field(name="👥 Clients", value=CLIENTS_TMPL.format_map(data), inline=True)
+        embed.add_field(name="⏱️ Heures coachées", value=HOURS_TMPL.format_map(data), inline=True)
+
+        stars = "⭐" * round(data['avg_rating']) if data['avg_rating'] > 0 else "—"
+        embed.add_field(
+            name="⭐ Satisfaction",
+            value=RATING_TMPL.format(stars=stars, **data) if data['feedback_count'] else "Aucun avis",
+            inline=True
+        )
+
+        if data['upcoming_week']:
+            upcoming_text = ""
+            for b in data['upcoming_week']:
+                type_emoji = "🆓" if b.booking_type == config.BOOKING_TYPE_FREE else "💰"
+                upcoming_text += f"{type_emoji} {b.scheduled_at.strftime('%d/%m à %H:%M')}\n"
+            if data['upcoming_count'] > 5:
+                upcoming_text += f"_+{data['upcoming_count'] - 5} autres..._"
+            embed.add_field(name=f"📅 Cette semaine ({data['upcoming_count']} sessions)", value=upcoming_text, inline=False)
+
+        if data['top_clients_text']:
+            embed.add_field(name="🏆 Top clients", value=data['top_clients_text'], inline=False)
+
+        embed.set_footer(text=f"Données au {now.strftime('%d/%m/%Y à %H:%M')}")
+        embed.timestamp = now
+
+        await interaction.followup.send(embed=embed, ephemeral=True)
+
+    def _compute_analytics(self, start_date: Optional[datetime], now: datetime) -> dict:
+        """
+        Run the analytics queries (blocking, meant for a worker thread)
+        """
         with get_session() as session:
-            # Base query
-            query = session.query(Booking)
+            # Per (status, type) counts and completed minutes in a single GROUP BY
+            tally_query = session.query(
+                Booking.status,
+                Booking.booking_type,
+                func.count(Booking.id),
+                func.coalesce(func.sum(
+                    case((Booking.status == config.STATUS_COMPLETED, Booking.duration_minutes), else_=0)
+                ), 0)
+            )
             if start_date:
-                query = query.filter(Booking.created_at >= start_date)
-
-            all_bookings = query.all()
+                tally_query = tally_query.filter(Booking.created_at >= start_date)
+            tally = tally_query.group_by(Booking.status, Booking.booking_type).all()
 
             # Session counts
-            total = len(all_bookings)
-            completed = len([b for b in all_bookings if b.status == config.STATUS_COMPLETED])
-            confirmed = len([b for b in all_bookings if b.status == config.STATUS_CONFIRMED])
-            cancelled = len([b for b in all_bookings if b.status == config.STATUS_CANCELLED])
-            no_shows = len([b for b in all_bookings if b.status == config.STATUS_NO_SHOW])
-            pending = len([b for b in all_bookings if b.status == "pending_schedule"])
-
-            free_sessions = len([b for b in all_bookings if b.booking_type == config.BOOKING_TYPE_FREE])
-            paid_sessions = len([b for b in all_bookings if b.booking_type == config.BOOKING_TYPE_PAID])
+            status_counts = Counter()
+            type_counts = Counter()
+            total_minutes = 0
+            for status, booking_type, count, minutes in tally:
+                status_counts[status] += count
+                type_counts[booking_type] += count
+                total_minutes += minutes
+            total = status_counts.total()
+
+            completed = status_counts[config.STATUS_COMPLETED]
+            confirmed = status_counts[config.STATUS_CONFIRMED]
+            cancelled = status_counts[config.STATUS_CANCELLED]
+            no_shows = status_counts[config.STATUS_NO_SHOW]
+            pending = status_counts[config.STATUS_PENDING_SCHEDULE]
+
+            free_sessions = type_counts[config.BOOKING_TYPE_FREE]
+            paid_sessions = type_counts[config.BOOKING_TYPE_PAID]
 
             # Rates
             completion_rate = (completed / total * 100) if total > 0 else 0
@@ -85,130 +197,82 @@ class Analytics(commands.Cog):
             cancellation_rate = (cancelled / total * 100) if total > 0 else 0
 
             # Active clients (with at least 1 booking in period)
-            client_ids = set(b.client_id for b in all_bookings)
-            active_clients = len(client_ids)
+            active_query = session.query(func.count(distinct(Booking.client_id)))
+            if start_date:
+                active_query = active_query.filter(Booking.created_at >= start_date)
+            active_clients = active_query.scalar()
 
             # New clients in period
+            new_clients_query = session.query(func.count(Client.id))
             if start_date:
-                new_clients = session.query(Client).filter(Client.created_at >= start_date).count()
-            else:
-                new_clients = session.query(Client).count()
+                new_clients_query = new_clients_query.filter(Client.created_at >= start_date)
+            new_clients = new_clients_query.scalar()
 
-            # Total hours coached
-            completed_bookings = [b for b in all_bookings if b.status == config.STATUS_COMPLETED]
-            total_minutes = sum(b.duration_minutes for b in completed_bookings)
-            total_hours = total_minutes / 60
+            # Total time coached, as whole hours plus leftover minutes
+            total_hours, extra_minutes = divmod(total_minutes, 60)
 
-            # Feedback stats
-            feedback_query = session.query(Feedback)
+            # Feedback count and average in one aggregate query
+            feedback_query = session.query(func.count(Feedback.id), func.coalesce(func.avg(Feedback.rating), 0))
             if start_date:
-                feedback_query = feedback_query.join(Booking).filter(Booking.created_at >= start_date)
-            feedbacks = feedback_query.all()
-            avg_rating = sum(f.rating for f in feedbacks) / len(feedbacks) if feedbacks else 0
+                feedback_query = feedback_query.join(Booking, Feedback.booking_id == Booking.id).filter(
+                    Booking.created_at >= start_date
+                )
+            feedback_count, avg_rating = feedback_query.one()
 
             # Upcoming sessions this week
             week_from_now = now + timedelta(weeks=1)
-            upcoming_week = [
-                b for b in session.query(Booking).filter(
-                    Booking.status == config.STATUS_CONFIRMED,
-                    Booking.scheduled_at >= now,
-                    Booking.scheduled_at <= week_from_now
-                ).all()
-            ]
+            # The first 5 rows plus the total count (window function) in one round-trip
+            upcoming_week = session.query(
+                Booking.scheduled_at, Booking.booking_type, func.count().over().label("total")
+            ).filter(
+                Booking.status == config.STATUS_CONFIRMED,
+                Booking.scheduled_at >= now,
+                Booking.scheduled_at <= week_from_now
+            ).order_by(Booking.scheduled_at).limit(5).all()
+            upcoming_count = upcoming_week[0].total if upcoming_week else 0
 
             # Top clients (most sessions)
-            client_session_counts = {}
-            for b in all_bookings:
-                if b.status in [config.STATUS_CONFIRMED, config.STATUS_COMPLETED]:
-                    client_session_counts[b.client_id] = client_session_counts.get(b.client_id, 0) + 1
+            top_query = session.query(Booking.client_id, func.count(Booking.id).label("sessions")).filter(
+                Booking.status.in_(ACTIVE_STATUSES)
+            )
+            if start_date:
+                top_query = top_query.filter(Booking.created_at >= start_date)
+            top_clients = top_query.group_by(Booking.client_id).order_by(desc("sessions")).limit(3).all()
+
+            top_client_ids = [cid for cid, _ in top_clients]
+            clients = {
+                c.id: c for c in session.query(Client).filter(Client.id.in_(top_client_ids)).all()
+            } if top_client_ids else {}
 
-            top_client_ids = sorted(client_session_counts, key=client_session_counts.get, reverse=True)[:3]
             top_clients_text = ""
-            for cid in top_client_ids:
-                client = session.query(Client).filter_by(id=cid).first()
+            for cid, count in top_clients:
+                client = clients.get(cid)
                 if client:
-                    count = client_session_counts[cid]
                     top_clients_text += f"• **{client.discord_name}** — {count} séance(s)\n"
 
-        # Build embed
-        embed = discord.Embed(
-            title=f"📈 Analytics — {period_label}",
-            color=config.BOT_COLOR
-        )
-
-        embed.add_field(
-            name="📊 Sessions",
-            value=(
-                f"**Total:** {total}\n"
-                f"✅ Complétées: **{completed}**\n"
-                f"⏳ Confirmées (à venir): **{confirmed}**\n"
-                f"📋 À planifier (packs): **{pending}**\n"
-                f"❌ Annulées: **{cancelled}**\n"
-                f"👻 No-show: **{no_shows}**"
-            ),
-            inline=True
-        )
-
-        embed.add_field(
-            name="📉 Taux",
-            value=(
-                f"✅ Complétion: **{completion_rate:.1f}%**\n"
-                f"❌ Annulation: **{cancellation_rate:.1f}%**\n"
-                f"👻 No-show: **{no_show_rate:.1f}%**"
-            ),
-            inline=True
-        )
-
-        embed.add_field(
-            name="💰 Types",
-            value=(
-                f"🆓 Gratuit: **{free_sessions}**\n"
-                f"💰 Payant: **{paid_sessions}**"
-            ),
-            inline=True
-        )
-
-        embed.add_field(
-            name="👥 Clients",
-            value=(
-                f"Actifs: **{active_clients}**\n"
-                f"Nouveaux: **{new_clients}**"
-            ),
-            inline=True
-        )
-
-        embed.add_field(
-            name="⏱️ Heures coachées",
-            value=f"**{total_hours:.1f}h** ({total_minutes} min)",
-            inline=True
-        )
-
-        stars = "⭐" * round(avg_rating) if avg_rating > 0 else "—"
-        embed.add_field(
-            name="⭐ Satisfaction",
-            value=f"{stars}\n**{avg_rating:.1f}/5** ({len(feedbacks)} avis)" if feedbacks else "Aucun avis",
-            inline=True
-        )
-
-        if upcoming_week:
-            upcoming_text = ""
-            for b in upcoming_week[:5]:
-                scheduled = b.scheduled_at
-                if scheduled.tzinfo is None:
-                    scheduled = config.TIMEZONE.localize(scheduled)
-                type_emoji = "🆓" if b.booking_type == config.BOOKING_TYPE_FREE else "💰"
-                upcoming_text += f"{type_emoji} {scheduled.strftime('%d/%m à %H:%M')}\n"
-            if len(upcoming_week) > 5:
-                upcoming_text += f"_+{len(upcoming_week) - 5} autres..._"
-            embed.add_field(name=f"📅 Cette semaine ({len(upcoming_week)} sessions)", value=upcoming_text, inline=False)
-
-        if top_clients_text:
-            embed.add_field(name="🏆 Top clients", value=top_clients_text, inline=False)
-
-        embed.set_footer(text=f"Données au {now.strftime('%d/%m/%Y à %H:%M')}")
-        embed.timestamp = datetime.utcnow()
-
-        await interaction.followup.send(embed=embed, ephemeral=True)
+        return {
+            "total": total,
+            "completed": completed,
+            "confirmed": confirmed,
+            "cancelled": cancelled,
+            "no_shows": no_shows,
+            "pending": pending,
+            "free_sessions": free_sessions,
+            "paid_sessions": paid_sessions,
+            "completion_rate": completion_rate,
+            "no_show_rate": no_show_rate,
+            "cancellation_rate": cancellation_rate,
+            "active_clients": active_clients,
+            "new_clients": new_clients,
+            "total_minutes": total_minutes,
+            "total_hours": total_hours,
+            "extra_minutes": extra_minutes,
+            "feedback_count": feedback_count,
+            "avg_rating": float(avg_rating),
+            "upcoming_week": upcoming_week,
+            "upcoming_count": upcoming_count,
+            "top_clients_text": top_clients_text,
+        }
 
     @app_commands.command(name="export", description="[Coach] Exporter les données de réservations en CSV")
     @app_commands.describe(period="Période à exporter")
@@ -217,17 +281,11 @@ class Analytics(commands.Cog):
         app_commands.Choice(name="Les 3 derniers mois", value="quarter"),
         app_commands.Choice(name="Tout le temps", value="all"),
     ])
+    @coach_check()
     async def export(self, interaction: discord.Interaction, period: str = "month"):
         """
         Export bookings data as CSV file
         """
-        if not is_coach(interaction.user) and not interaction.user.guild_permissions.administrator:
-            await interaction.response.send_message(
-                embed=create_error_embed("Vous devez être coach pour utiliser cette commande."),
-                ephemeral=True
-            )
-            return
-
         await interaction.response.defer(ephemeral=True)
 
         now = datetime.now(config.TIMEZONE)
@@ -242,58 +300,69 @@ class Analytics(commands.Cog):
             start_date = None
             period_label = "tout"
 
+        # Blocking query + CSV writing run on a worker thread
+        buffer, row_count = await asyncio.to_thread(self._build_export, start_date)
+
+        if not row_count:
+            await interaction.followup.send(
+                embed=create_error_embed("Aucune donnée à exporter pour cette période."),
+                ephemeral=True
+            )
+            return
+
+        buffer.seek(0)
+        file = discord.File(
+            fp=buffer,
+            filename=f"reservations_{period_label}_{now.strftime('%Y%m%d')}.csv"
+        )
+
+        await interaction.followup.send(
+            content=f"📊 Export de **{row_count}** réservation(s) — période: **{period_label.replace('_', ' ')}**",
+            file=file,
+            ephemeral=True
+        )
+
+    def _build_export(self, start_date: Optional[datetime]) -> Tuple[io.BytesIO, int]:
+        """
+        Write the bookings of the period as CSV (blocking, meant for a worker thread)
+
+        Returns:
+            The CSV buffer and the number of exported bookings
+        """
         with get_session() as session:
-            query = session.query(Booking).join(Client)
+            query = session.query(Booking, Client).join(Client, Booking.client_id == Client.id)
             if start_date:
                 query = query.filter(Booking.created_at >= start_date)
-            bookings = query.order_by(Booking.scheduled_at.desc()).all()
-
-            if not bookings:
-                await interaction.followup.send(
-                    embed=create_error_embed("Aucune donnée à exporter pour cette période."),
-                    ephemeral=True
-                )
-                return
 
-            # Build CSV in memory
-            output = io.StringIO()
-            writer = csv.writer(output, delimiter=';')
+            # Stream rows straight into the encoded buffer (utf-8-sig for Excel compatibility)
+            buffer = io.BytesIO()
+            text = io.TextIOWrapper(buffer, encoding="utf-8-sig", newline="")
+            writer = csv.writer(text, delimiter=';')
 
             writer.writerow([
                 "ID", "Client", "Discord ID", "Type", "Statut",
                 "Date session", "Durée (min)", "Date création", "Notes"
             ])
 
-            for b in bookings:
-                client = session.query(Client).filter_by(id=b.client_id).first()
-                scheduled = b.scheduled_at
-                if scheduled.tzinfo is None:
-                    scheduled = config.TIMEZONE.localize(scheduled)
-
+            row_count = 0
+            for b, client in query.order_by(Booking.scheduled_at.desc()).yield_per(500):
                 writer.writerow([
                     b.id,
                     client.discord_name if client else "Inconnu",
                     client.discord_id if client else "",
                     b.booking_type,
                     b.status,
-                    scheduled.strftime("%d/%m/%Y %H:%M"),
+                    fmt_dt(b.scheduled_at),
                     b.duration_minutes,
-                    b.created_at.strftime("%d/%m/%Y %H:%M"),
+                    fmt_dt(b.created_at),
                     (b.notes or "").replace("\n", " ")
                 ])
+                row_count += 1
 
-            output.seek(0)
-            csv_bytes = output.getvalue().encode("utf-8-sig")  # utf-8-sig for Excel compatibility
-            file = discord.File(
-                fp=io.BytesIO(csv_bytes),
-                filename=f"reservations_{period_label}_{now.strftime('%Y%m%d')}.csv"
-            )
+            text.flush()
+            text.detach()  # Keep the BytesIO open once the wrapper is gone
 
-        await interaction.followup.send(
-            content=f"📊 Export de **{len(bookings)}** réservation(s) — période: **{period_label.replace('_', ' ')}**",
-            file=file,
-            ephemeral=True
-        )
+        return buffer, row_count
 
 
 async def setup(bot):
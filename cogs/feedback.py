@@ -3,10 +3,15 @@ Feedback Cog - Post-session feedback system
 """
 import discord
 from discord.ext import commands, tasks
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+import asyncio
+from typing import List
+from sqlalchemy import exists, select, update
 import config
-from database import get_session, Booking, Client, Feedback
+from database import get_async_session, Booking, Client, Feedback
 from views.feedback_views import FeedbackView
+from utils.ratelimit import DM_CONCURRENCY
+from utils.users import get_or_fetch_user
 
 
 class FeedbackCog(commands.Cog):
@@ -35,32 +40,65 @@ class FeedbackCog(commands.Cog):
         """
         Check for recently completed sessions and send feedback requests
         """
-        now = datetime.now(config.TIMEZONE)
+        completed_ids = await self._complete_ended_sessions(datetime.now(config.TIMEZONE))
+        if not completed_ids:
+            return
+        for booking_id in completed_ids:
+            self.bot.dispatch("booking_status_changed", booking_id, config.STATUS_COMPLETED)
 
-        with get_session() as session:
-            # Get sessions that ended in the last 2 hours and don't have feedback yet
+        # Concurrent DMs, bounded to stay clear of Discord rate limits
+        semaphore = asyncio.Semaphore(DM_CONCURRENCY)
+
+        async def send_request(booking_id):
+            async with semaphore:
+                try:
+                    await self.send_feedback_request(booking_id)
+                except Exception as e:
+                    print(f"❌ Error sending feedback request for booking {booking_id}: {e}")
+
+        await asyncio.gather(*(send_request(booking_id) for booking_id in completed_ids))
+
+    async def _complete_ended_sessions(self, now: datetime) -> List[int]:
+        """
+        Mark confirmed sessions that ended without feedback as completed
+
+        Returns:
+            IDs of the bookings that were marked completed
+        """
+        async with get_async_session() as session:
+            # Get sessions that started in the last 2 hours and don't have feedback yet
             two_hours_ago = now - timedelta(hours=2)
 
-            bookings = session.query(Booking).outerjoin(Feedback).filter(
-                Booking.status == config.STATUS_CONFIRMED,
-                Booking.scheduled_at < now,
-                Booking.scheduled_at > two_hours_ago,
-                Feedback.id == None  # No feedback exists
-            ).all()
-
-            for booking in bookings:
-                # Ensure timezone-aware comparison
-                scheduled = booking.scheduled_at
-                if scheduled.tzinfo is None:
-                    scheduled = config.TIMEZONE.localize(scheduled)
-
-                # Check if session is really completed (scheduled_at + duration has passed)
-                session_end = scheduled + timedelta(minutes=booking.duration_minutes)
-                if session_end <= now:
-                    await self.send_feedback_request(booking)
-                    # Mark booking as completed
-                    booking.status = config.STATUS_COMPLETED
-                    session.commit()
+            candidates = (await session.execute(
+                select(Booking.id, Booking.scheduled_at, Booking.duration_minutes).where(
+                    Booking.status == config.STATUS_CONFIRMED,
+                    Booking.scheduled_at < now,
+                    Booking.scheduled_at > two_hours_ago,
+                    ~exists().where(Feedback.booking_id == Booking.id)  # No feedback exists
+                )
+            )).all()
+
+            # Check if session is really completed (scheduled_at + duration has passed)
+            # scheduled_at is stored as naive local time, compare against local wall-clock now
+            local_now = now.replace(tzinfo=None)
+            ended_ids = [
+                booking_id for booking_id, scheduled, duration in candidates
+                if scheduled + timedelta(minutes=duration) <= local_now
+            ]
+
+            if not ended_ids:
+                return []
+
+            # Mark them all completed in one statement, keeping only rows still confirmed
+            completed_ids = (await session.execute(
+                update(Booking)
+                .where(Booking.id.in_(ended_ids), Booking.status == config.STATUS_CONFIRMED)
+                .values(status=config.STATUS_COMPLETED)
+                .returning(Booking.id),
+                execution_options={"synchronize_session": False}
+            )).scalars().all()
+
+        return completed_ids
 
     @check_completed_sessions.before_loop
     async def before_check_completed_sessions(self):
@@ -69,37 +107,41 @@ class FeedbackCog(commands.Cog):
         """
         await self.bot.wait_until_ready()
 
-    async def send_feedback_request(self, booking: Booking):
+    async def send_feedback_request(self, booking_id: int):
         """
         Send feedback request to client after session
 
         Args:
-            booking: The completed booking
+            booking_id: ID of the completed booking
         """
-        with get_session() as session:
-            client = session.query(Client).filter_by(id=booking.client_id).first()
-            if not client:
-                return
-
-            # Get Discord user
-            try:
-                user = await self.bot.fetch_user(int(client.discord_id))
-            except:
-                print(f"❌ Could not fetch user {client.discord_id}")
-                return
-
-            # Create and send feedback view
-            feedback_view = FeedbackView(
-                booking_id=booking.id,
-                client_name=client.discord_name,
-                final_callback=self.save_feedback
-            )
-
-            try:
-                await feedback_view.start(user)
-                print(f"✅ Sent feedback request to {client.discord_name} for booking {booking.id}")
-            except discord.Forbidden:
-                print(f"❌ Cannot send DM to {client.discord_name}")
+        async with get_async_session() as session:
+            client = (await session.execute(
+                select(Client.discord_id, Client.discord_name)
+                .join(Booking, Booking.client_id == Client.id)
+                .where(Booking.id == booking_id)
+            )).first()
+        if not client:
+            return
+
+        # Get Discord user
+        try:
+            user = await get_or_fetch_user(self.bot, int(client.discord_id))
+        except:
+            print(f"❌ Could not fetch user {client.discord_id}")
+            return
+
+        # Create and send feedback view
+        feedback_view = FeedbackView(
+            booking_id=booking_id,
+            client_name=client.discord_name,
+            final_callback=self.save_feedback
+        )
+
+        try:
+            await feedback_view.start(user)
+            print(f"✅ Sent feedback request to {client.discord_name} for booking {booking_id}")
+        except discord.Forbidden:
+            print(f"❌ Cannot send DM to {client.discord_name}")
 
     async def save_feedback(self, booking_id: int, rating: int, comment: str, should_share: bool):
         """
@@ -111,51 +153,52 @@ class FeedbackCog(commands.Cog):
             comment: Optional comment
             should_share: Whether to share in public channel
         """
-        with get_session() as session:
+        row = None
+        async with get_async_session() as session:
             # Create feedback
-            feedback = Feedback(
+            session.add(Feedback(
                 booking_id=booking_id,
                 rating=rating,
                 comment=comment,
                 posted_to_channel=should_share
-            )
-            session.add(feedback)
-            session.commit()
+            ))
 
-            # If should share, post in feedback channel
             if should_share and config.FEEDBACK_CHANNEL_ID:
-                guild = self.bot.get_guild(config.GUILD_ID)
-                if guild:
-                    feedback_channel = guild.get_channel(config.FEEDBACK_CHANNEL_ID)
-                    if feedback_channel:
-                        # Get booking and client info
-                        booking = session.query(Booking).filter_by(id=booking_id).first()
-                        if booking:
-                            client = session.query(Client).filter_by(id=booking.client_id).first()
-                            if client:
-                                # Create feedback embed
-                                stars = "⭐" * rating
-                                embed = discord.Embed(
-                                    title=f"{stars} Nouveau feedback!",
-                                    description=comment if comment else "_Pas de commentaire_",
-                                    color=config.SUCCESS_COLOR
-                                )
-                                embed.add_field(
-                                    name="Client",
-                                    value=client.discord_name,
-                                    inline=True
-                                )
-                                embed.add_field(
-                                    name="Date de la session",
-                                    value=booking.scheduled_at.strftime("%d/%m/%Y"),
-                                    inline=True
-                                )
-                                embed.timestamp = datetime.utcnow()
-
-                                try:
-                                    await feedback_channel.send(embed=embed)
-                                except discord.Forbidden:
-                                    print(f"❌ Cannot send to feedback channel")
+                # Get booking date and client name in one query
+                row = (await session.execute(
+                    select(Booking.scheduled_at, Client.discord_name)
+                    .join(Client, Client.id == Booking.client_id)
+                    .where(Booking.id == booking_id)
+                )).first()
+
+        # If should share, post in feedback channel (the session is closed before any Discord call)
+        if row:
+            guild = self.bot.get_guild(config.GUILD_ID)
+            feedback_channel = guild.get_channel(config.FEEDBACK_CHANNEL_ID) if guild else None
+            if feedback_channel:
+                # Create feedback embed
+                stars = "⭐" * rating
+                embed = discord.Embed(
+                    title=f"{stars} Nouveau feedback!",
+                    description=comment if comment else "_Pas de commentaire_",
+                    color=config.SUCCESS_COLOR
+                )
+                embed.add_field(
+                    name="Client",
+                    value=row.discord_name,
+                    inline=True
+                )
+                embed.add_field(
+                    name="Date de la session",
+                    value=row.scheduled_at.strftime("%d/%m/%Y"),
+                    inline=True
+                )
+                embed.timestamp = datetime.now(timezone.utc)
+
+                try:
+                    await feedback_channel.send(embed=embed)
+                except discord.Forbidden:
+                    print(f"❌ Cannot send to feedback channel")
 
         print(f"✅ Saved feedback for booking {booking_id}: {rating}/5 stars")
 
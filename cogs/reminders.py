@@ -3,11 +3,172 @@ Reminders Cog - Automatic reminders for coaching sessions
 """
 import discord
 from discord.ext import commands, tasks
-from datetime import datetime, timedelta
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Set, Tuple
+import asyncio
 import datetime as dt
+from sqlalchemy import and_, bindparam, func, or_, select, update
 import config
-from database import get_session, Booking, Client
+from database import get_async_session, Booking, Client
 from utils.embeds import create_info_embed
+from utils.formatting import fmt_time
+from utils.permissions import get_coaches, invalidate_coaches
+from utils.ratelimit import DM_CONCURRENCY, broadcast_dm, send_dm
+from utils.users import get_or_fetch_user
+
+
+# Reminder kind -> how long before the session it is sent
+REMINDER_LEADS = {
+    "24h": timedelta(hours=24),
+    "1h": timedelta(hours=1),
+}
+# A reminder whose send time passed less than this long ago is still sent
+REMINDER_GRACE = timedelta(minutes=15)
+# How often confirmed bookings are re-synced into the scheduler
+REMINDER_SYNC_INTERVAL = timedelta(hours=6)
+# How far ahead of now a sync looks: bookings further out are picked up by a later sync
+REMINDER_SYNC_WINDOW = max(REMINDER_LEADS.values()) + REMINDER_SYNC_INTERVAL + REMINDER_GRACE
+# A reminder that failed on a transient Discord error is retried after this long,
+# as long as it stays within REMINDER_GRACE of its send time
+REMINDER_RETRY_DELAY = timedelta(minutes=5)
+
+# Recurring statements, built once with bound parameters so each run reuses
+# SQLAlchemy's compiled form and the driver's cached prepared statement
+_CLAIM_REMINDERS = {
+    kind: update(Booking)
+    .where(
+        Booking.id.in_(bindparam("booking_ids", expanding=True)),
+        Booking.status == config.STATUS_CONFIRMED,
+        flag.is_(False)
+    )
+    .values({flag: True})
+    .returning(Booking.id, Booking.client_id, Booking.scheduled_at, Booking.duration_minutes, Booking.booking_type)
+    for kind, flag in (("24h", Booking.reminder_24h_sent), ("1h", Booking.reminder_1h_sent))
+}
+_RELEASE_REMINDERS = {
+    kind: update(Booking)
+    .where(Booking.id.in_(bindparam("booking_ids", expanding=True)))
+    .values({flag: False})
+    for kind, flag in (("24h", Booking.reminder_24h_sent), ("1h", Booking.reminder_1h_sent))
+}
+_DAY_BOOKINGS = select(
+    Booking.id, Booking.scheduled_at, Booking.duration_minutes, Booking.booking_type, Client.discord_name
+).join(Client, Client.id == Booking.client_id).where(
+    Booking.status == config.STATUS_CONFIRMED,
+    Booking.scheduled_at >= bindparam("day_start"),
+    Booking.scheduled_at < bindparam("day_end")
+).order_by(Booking.scheduled_at)
+_EXPIRE_PACKS = update(Booking).where(
+    Booking.status == config.STATUS_PENDING_SCHEDULE,
+    Booking.created_at <= bindparam("expiry_threshold")
+).values(status=config.STATUS_CANCELLED).returning(Booking.id)
+
+# Date format of the 24h reminder
+_FMT_DATETIME = "%d/%m/%Y à %H:%M"
+# Embed skeletons shared by every reminder, copied and filled per send
+_REMINDER_24H_EMBED = discord.Embed(
+    title="🔔 Rappel de session - 24h",
+    color=config.BOT_COLOR
+).set_footer(text="Vous recevrez un autre rappel 1h avant la session")
+_REMINDER_1H_EMBED = discord.Embed(
+    title="🔔 Rappel de session - 1h",
+    color=config.WARNING_COLOR
+).set_footer(text="À tout de suite! 🎮")
+
+
+class ReminderScheduler:
+    """
+    Keeps one sleeping task per reminder due time instead of polling the database
+
+    Reminders due at the same moment (sessions starting at the same time) share
+    a slot and are fired together.
+    """
+
+    def __init__(self, fire):
+        """
+        Args:
+            fire: coroutine function called as fire(kind, booking_ids) when reminders are due
+        """
+        self._fire = fire
+        # (kind, due_at) -> booking ids, and the task sleeping until due_at
+        self._slots: Dict[Tuple[str, datetime], Set[int]] = {}
+        self._slot_tasks: Dict[Tuple[str, datetime], asyncio.Task] = {}
+        # booking id -> slots it belongs to
+        self._booking_slots: Dict[int, List[Tuple[str, datetime]]] = {}
+
+    def is_scheduled(self, booking_id: int) -> bool:
+        return booking_id in self._booking_slots
+
+    def schedule(self, booking_id: int, scheduled_at: datetime, kinds=REMINDER_LEADS):
+        """
+        (Re)schedule the reminders of a booking, replacing any previous ones
+        """
+        self.cancel(booking_id)
+
+        # Naive values come from the database and are local wall-clock times
+        if scheduled_at.tzinfo is None:
+            scheduled_at = scheduled_at.replace(tzinfo=config.TIMEZONE)
+        now = datetime.now(config.TIMEZONE)
+
+        for kind in kinds:
+            due_at = scheduled_at - REMINDER_LEADS[kind]
+            if (due_at - now) < -REMINDER_GRACE:
+                continue  # Too late for this reminder
+            self.add(booking_id, kind, due_at)
+
+    def add(self, booking_id: int, kind: str, due_at: datetime):
+        """
+        Add one reminder of a booking, keeping its other pending reminders
+        """
+        key = (kind, due_at)
+        if key not in self._slots:
+            delay = (due_at - datetime.now(config.TIMEZONE)).total_seconds()
+            self._slots[key] = set()
+            self._slot_tasks[key] = asyncio.create_task(self._run(key, max(delay, 0)))
+        self._slots[key].add(booking_id)
+        slots = self._booking_slots.setdefault(booking_id, [])
+        if key not in slots:
+            slots.append(key)
+
+    def cancel(self, booking_id: int):
+        """
+        Cancel the pending reminders of a booking
+        """
+        for key in self._booking_slots.pop(booking_id, ()):
+            booking_ids = self._slots.get(key)
+            if booking_ids is None:
+                continue
+            booking_ids.discard(booking_id)
+            if not booking_ids:
+                del self._slots[key]
+                self._slot_tasks.pop(key).cancel()
+
+    def cancel_all(self):
+        for task in self._slot_tasks.values():
+            task.cancel()
+        self._slots.clear()
+        self._slot_tasks.clear()
+        self._booking_slots.clear()
+
+    async def _run(self, key: Tuple[str, datetime], delay: float):
+        await asyncio.sleep(delay)
+        kind = key[0]
+        booking_ids = self._slots.pop(key, set())
+        self._slot_tasks.pop(key, None)
+        for booking_id in booking_ids:
+            self._forget(booking_id, key)
+
+        try:
+            await self._fire(kind, booking_ids)
+        except Exception as e:
+            print(f"❌ Error sending {kind} reminders for bookings {sorted(booking_ids)}: {e}")
+
+    def _forget(self, booking_id: int, key: Tuple[str, datetime]):
+        slots = self._booking_slots.get(booking_id)
+        if slots and key in slots:
+            slots.remove(key)
+            if not slots:
+                del self._booking_slots[booking_id]
 
 
 class Reminders(commands.Cog):
@@ -17,15 +178,19 @@ class Reminders(commands.Cog):
 
     def __init__(self, bot):
         self.bot = bot
-        self.check_reminders.start()
+        self.scheduler = ReminderScheduler(self.fire_reminders)
+        # When the next known booking enters the sync window, None forces a scan
+        self._next_sync_due = None
+        self.sync_reminders.start()
         self.daily_coach_summary.start()
         self.check_pack_expiry.start()
 
     def cog_unload(self):
         """
-        Stop the reminder task when cog is unloaded
+        Stop the reminder tasks when cog is unloaded
         """
-        self.check_reminders.cancel()
+        self.sync_reminders.cancel()
+        self.scheduler.cancel_all()
         self.daily_coach_summary.cancel()
         self.check_pack_expiry.cancel()
 
@@ -35,149 +200,262 @@ class Reminders(commands.Cog):
         """
         print("🔔 Reminders cog loaded")
 
-    @tasks.loop(minutes=15)  # Check every 15 minutes
-    async def check_reminders(self):
+    @commands.Cog.listener()
+    async def on_booking_scheduled(self, booking_id: int, scheduled_at: datetime):
         """
-        Check for upcoming sessions and send reminders
+        Schedule the reminders of a newly confirmed or rescheduled booking
+        """
+        self.scheduler.schedule(booking_id, scheduled_at)
+        self._next_sync_due = None
+
+    @commands.Cog.listener()
+    async def on_booking_cancelled(self, booking_id: int):
+        """
+        Drop the reminders of a cancelled or deleted booking
+        """
+        self.scheduler.cancel(booking_id)
+        self._next_sync_due = None
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        """
+        Refresh the coach snapshot when someone gains or loses the coach role
+        """
+        if before.roles != after.roles:
+            changed = set(before.roles).symmetric_difference(after.roles)
+            if any(role.id == config.COACH_ROLE_ID for role in changed):
+                invalidate_coaches(after.guild.id)
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: discord.Member):
+        """
+        Refresh the coach snapshot when a coach leaves the server
+        """
+        if any(role.id == config.COACH_ROLE_ID for role in member.roles):
+            invalidate_coaches(member.guild.id)
+
+    @tasks.loop(seconds=REMINDER_SYNC_INTERVAL.total_seconds())
+    async def sync_reminders(self):
+        """
+        Schedule reminders for confirmed bookings that don't have any yet
+
+        Runs at startup (restarts lose the in-memory tasks) and then as a safety
+        net for bookings created without a booking_scheduled event. Ticks are
+        skipped until the next known booking enters the window or a booking
+        event arrives.
         """
         now = datetime.now(config.TIMEZONE)
+        # Nothing enters the window before the next known booking does, skip the scan
+        if self._next_sync_due is not None and now < self._next_sync_due:
+            return
+
+        horizon = now + REMINDER_SYNC_WINDOW
 
-        # Get all confirmed bookings
-        with get_session() as session:
-            bookings = session.query(Booking).filter(
-                Booking.status == config.STATUS_CONFIRMED,
-                Booking.scheduled_at > now
-            ).all()
-
-            for booking in bookings:
-                scheduled = booking.scheduled_at
-                # Ensure timezone-aware comparison
-                if scheduled.tzinfo is None:
-                    scheduled = config.TIMEZONE.localize(scheduled)
-                time_until = scheduled - now
-
-                # 24h reminder - only if not already sent
-                if (config.REMINDER_24H_ENABLED
-                        and not booking.reminder_24h_sent
-                        and timedelta(hours=23, minutes=45) <= time_until <= timedelta(hours=24, minutes=15)):
-                    await self.send_24h_reminder(booking)
-                    booking.reminder_24h_sent = True
-                    session.commit()
-
-                # 1h reminder - only if not already sent
-                if (config.REMINDER_1H_ENABLED
-                        and not booking.reminder_1h_sent
-                        and timedelta(minutes=45) <= time_until <= timedelta(hours=1, minutes=15)):
-                    await self.send_1h_reminder(booking)
-                    booking.reminder_1h_sent = True
-                    session.commit()
-
-    @check_reminders.before_loop
-    async def before_check_reminders(self):
+        # Only rows with a reminder still due: flag unset and send time not long past
+        due = {
+            kind: and_(
+                flag.is_(False),
+                Booking.scheduled_at >= now + REMINDER_LEADS[kind] - REMINDER_GRACE
+            )
+            for kind, flag, enabled in (
+                ("24h", Booking.reminder_24h_sent, config.REMINDER_24H_ENABLED),
+                ("1h", Booking.reminder_1h_sent, config.REMINDER_1H_ENABLED),
+            )
+            if enabled
+        }
+        if not due:
+            return
+
+        async with get_async_session() as session:
+            bookings = (await session.execute(
+                select(Booking.id, Booking.scheduled_at, *(cond.label(kind) for kind, cond in due.items())).where(
+                    Booking.status == config.STATUS_CONFIRMED,
+                    Booking.scheduled_at <= horizon,
+                    or_(*due.values())
+                )
+            )).all()
+
+            next_scheduled_at = (await session.execute(
+                select(func.min(Booking.scheduled_at)).where(
+                    Booking.status == config.STATUS_CONFIRMED,
+                    Booking.scheduled_at > horizon
+                )
+            )).scalar()
+
+        if next_scheduled_at is None:
+            self._next_sync_due = datetime.max.replace(tzinfo=config.TIMEZONE)
+        else:
+            if next_scheduled_at.tzinfo is None:
+                next_scheduled_at = next_scheduled_at.replace(tzinfo=config.TIMEZONE)
+            self._next_sync_due = next_scheduled_at - REMINDER_SYNC_WINDOW
+
+        for booking in bookings:
+            if self.scheduler.is_scheduled(booking.id):
+                continue
+            kinds = [kind for kind in due if booking._mapping[kind]]
+            self.scheduler.schedule(booking.id, booking.scheduled_at, kinds)
+
+    @sync_reminders.before_loop
+    async def before_sync_reminders(self):
         """
         Wait until the bot is ready before starting the task
         """
         await self.bot.wait_until_ready()
 
-    async def send_24h_reminder(self, booking: Booking):
+    async def fire_reminders(self, kind: str, booking_ids: Set[int]):
         """
-        Send 24h reminder to client
-
-        Args:
-            booking: The booking to send reminder for
+        Send due reminders for the bookings still confirmed that didn't get them yet
         """
-        with get_session() as session:
-            client = session.query(Client).filter_by(id=booking.client_id).first()
-            if not client:
+        if kind == "24h" and not config.REMINDER_24H_ENABLED:
+            return
+        if kind == "1h" and not config.REMINDER_1H_ENABLED:
+            return
+
+        async with get_async_session() as session:
+            # Claim the whole batch in one write, so overlapping runs can't send twice
+            bookings = (await session.execute(
+                _CLAIM_REMINDERS[kind],
+                {"booking_ids": list(booking_ids)},
+                execution_options={"synchronize_session": False}
+            )).all()
+            if not bookings:
                 return
 
-            # Get Discord user
-            try:
-                user = await self.bot.fetch_user(int(client.discord_id))
-            except:
-                print(f"❌ Could not fetch user {client.discord_id}")
-                return
+            clients = {
+                client.id: client
+                for client in (await session.execute(
+                    select(Client.id, Client.discord_id, Client.discord_name).where(
+                        Client.id.in_({booking.client_id for booking in bookings})
+                    )
+                )).all()
+            }
 
-            # Create reminder embed
-            type_label = "Coaching Gratuit" if booking.booking_type == config.BOOKING_TYPE_FREE else "Coaching Payant"
-            embed = discord.Embed(
-                title="🔔 Rappel de session - 24h",
-                description=f"Votre session de **{type_label.lower()}** aura lieu demain!",
-                color=config.BOT_COLOR
-            )
-            embed.add_field(
-                name="📅 Date et heure",
-                value=booking.scheduled_at.strftime("%d/%m/%Y à %H:%M"),
-                inline=False
-            )
-            embed.add_field(
-                name="⏱️ Durée",
-                value=f"{booking.duration_minutes} minutes",
-                inline=True
-            )
-            embed.add_field(
-                name="🆔 ID de réservation",
-                value=f"`{booking.id}`",
-                inline=True
+        # DMs are sent once the session is released
+        send_reminder = self.send_24h_reminder if kind == "24h" else self.send_1h_reminder
+        semaphore = asyncio.Semaphore(DM_CONCURRENCY)
+        failed = []
+
+        async def send_one(booking):
+            client = clients.get(booking.client_id)
+            if not client:
+                return
+            async with semaphore:
+                try:
+                    await send_reminder(booking, client)
+                except discord.HTTPException as e:
+                    # Transient Discord error (5xx, rate limit retries exhausted): retry later
+                    print(f"❌ Error sending {kind} reminder for booking {booking.id}, will retry: {e}")
+                    failed.append(booking)
+                except Exception as e:
+                    print(f"❌ Error sending {kind} reminder for booking {booking.id}: {e}")
+
+        await asyncio.gather(*(send_one(booking) for booking in bookings))
+
+        if failed:
+            await self._release_reminders(kind, failed)
+
+    async def _release_reminders(self, kind: str, bookings):
+        """
+        Clear the sent flag of reminders that failed, and retry them while still in the grace window
+        """
+        async with get_async_session() as session:
+            await session.execute(
+                _RELEASE_REMINDERS[kind],
+                {"booking_ids": [booking.id for booking in bookings]},
+                execution_options={"synchronize_session": False}
             )
-            embed.set_footer(text="Vous recevrez un autre rappel 1h avant la session")
-            embed.timestamp = datetime.utcnow()
 
-            try:
-                await user.send(embed=embed)
-                print(f"✅ Sent 24h reminder to {client.discord_name} for booking {booking.id}")
-            except discord.Forbidden:
-                print(f"❌ Cannot send DM to {client.discord_name}")
+        retry_at = datetime.now(config.TIMEZONE) + REMINDER_RETRY_DELAY
+        for booking in bookings:
+            due_at = booking.scheduled_at.replace(tzinfo=config.TIMEZONE) - REMINDER_LEADS[kind]
+            if retry_at <= due_at + REMINDER_GRACE:
+                self.scheduler.add(booking.id, kind, retry_at)
 
-    async def send_1h_reminder(self, booking: Booking):
+    async def send_24h_reminder(self, booking, client):
         """
-        Send 1h reminder to client
+        Send 24h reminder to client
 
         Args:
-            booking: The booking to send reminder for
+            booking: Row with the booking id, scheduled_at, duration_minutes and booking_type
+            client: Row with the client discord_id and discord_name
         """
-        with get_session() as session:
-            client = session.query(Client).filter_by(id=booking.client_id).first()
-            if not client:
-                return
-
-            # Get Discord user
-            try:
-                user = await self.bot.fetch_user(int(client.discord_id))
-            except:
-                print(f"❌ Could not fetch user {client.discord_id}")
-                return
-
-            # Create reminder embed
-            type_label = "Coaching Gratuit" if booking.booking_type == config.BOOKING_TYPE_FREE else "Coaching Payant"
-            embed = discord.Embed(
-                title="🔔 Rappel de session - 1h",
-                description=f"Votre session de **{type_label.lower()}** commence dans **1 heure**!",
-                color=config.WARNING_COLOR
-            )
-            embed.add_field(
-                name="📅 Heure de début",
-                value=booking.scheduled_at.strftime("%H:%M"),
-                inline=False
-            )
-            embed.add_field(
-                name="⏱️ Durée",
-                value=f"{booking.duration_minutes} minutes",
-                inline=True
-            )
-            embed.add_field(
-                name="🆔 ID",
-                value=f"`{booking.id}`",
-                inline=True
-            )
-            embed.set_footer(text="À tout de suite! 🎮")
-            embed.timestamp = datetime.utcnow()
+        # Get Discord user
+        # Other HTTP errors are transient and go up to fire_reminders for a retry
+        try:
+            user = await get_or_fetch_user(self.bot, int(client.discord_id))
+        except discord.NotFound:
+            print(f"❌ Could not fetch user {client.discord_id}")
+            return
+
+        # Create reminder embed
+        type_label = "coaching gratuit" if booking.booking_type == config.BOOKING_TYPE_FREE else "coaching payant"
+        embed = _REMINDER_24H_EMBED.copy()
+        embed.description = f"Votre session de **{type_label}** aura lieu demain!"
+        embed.add_field(
+            name="📅 Date et heure",
+            value=booking.scheduled_at.strftime(_FMT_DATETIME),
+            inline=False
+        )
+        embed.add_field(
+            name="⏱️ Durée",
+            value=f"{booking.duration_minutes} minutes",
+            inline=True
+        )
+        embed.add_field(
+            name="🆔 ID de réservation",
+            value=f"`{booking.id}`",
+            inline=True
+        )
+        embed.timestamp = datetime.now(timezone.utc)
+
+        try:
+            await send_dm(user, embed=embed)
+            print(f"✅ Sent 24h reminder to {client.discord_name} for booking {booking.id}")
+        except discord.Forbidden:
+            print(f"❌ Cannot send DM to {client.discord_name}")
+
+    async def send_1h_reminder(self, booking, client):
+        """
+        Send 1h reminder to client
 
-            try:
-                await user.send(embed=embed)
-                print(f"✅ Sent 1h reminder to {client.discord_name} for booking {booking.id}")
-            except discord.Forbidden:
-                print(f"❌ Cannot send DM to {client.discord_name}")
+        Args:
+            booking: Row with the booking id, scheduled_at, duration_minutes and booking_type
+            client: Row with the client discord_id and discord_name
+        """
+        # Get Discord user
+        # Other HTTP errors are transient and go up to fire_reminders for a retry
+        try:
+            user = await get_or_fetch_user(self.bot, int(client.discord_id))
+        except discord.NotFound:
+            print(f"❌ Could not fetch user {client.discord_id}")
+            return
+
+        # Create reminder embed
+        type_label = "coaching gratuit" if booking.booking_type == config.BOOKING_TYPE_FREE else "coaching payant"
+        embed = _REMINDER_1H_EMBED.copy()
+        embed.description = f"Votre session de **{type_label}** commence dans **1 heure**!"
+        embed.add_field(
+            name="📅 Heure de début",
+            value=fmt_time(booking.scheduled_at),
+            inline=False
+        )
+        embed.add_field(
+            name="⏱️ Durée",
+            value=f"{booking.duration_minutes} minutes",
+            inline=True
+        )
+        embed.add_field(
+            name="🆔 ID",
+            value=f"`{booking.id}`",
+            inline=True
+        )
+        embed.timestamp = datetime.now(timezone.utc)
+
+        try:
+            await send_dm(user, embed=embed)
+            print(f"✅ Sent 1h reminder to {client.discord_name} for booking {booking.id}")
+        except discord.Forbidden:
+            print(f"❌ Cannot send DM to {client.discord_name}")
 
     @tasks.loop(time=dt.time(hour=20, minute=0, tzinfo=config.TIMEZONE))
     async def daily_coach_summary(self):
@@ -186,51 +464,43 @@ class Reminders(commands.Cog):
         """
         now = datetime.now(config.TIMEZONE)
         tomorrow_start = (now + timedelta(days=1)).replace(hour=0, minute=0, second=0, microsecond=0)
-        tomorrow_end = (now + timedelta(days=1)).replace(hour=23, minute=59, second=59, microsecond=999999)
+        tomorrow_end = tomorrow_start + timedelta(days=1)
         tomorrow_label = tomorrow_start.strftime("%d/%m/%Y")
 
-        # Get tomorrow's bookings
-        with get_session() as session:
-            bookings = session.query(Booking).filter(
-                Booking.status == config.STATUS_CONFIRMED,
-                Booking.scheduled_at >= tomorrow_start,
-                Booking.scheduled_at <= tomorrow_end
-            ).order_by(Booking.scheduled_at).all()
-
-            if not bookings:
-                return
-
-            # Create summary embed
-            embed = discord.Embed(
-                title=f"📅 Planning de demain — {tomorrow_label}",
-                description=f"Vous avez **{len(bookings)}** session(s) prévue(s) demain",
-                color=config.BOT_COLOR
+        # Tomorrow's bookings with their client name in a single JOIN,
+        # the session is released before any DM goes out
+        async with get_async_session() as session:
+            bookings = (await session.execute(
+                _DAY_BOOKINGS, {"day_start": tomorrow_start, "day_end": tomorrow_end}
+            )).all()
+
+        if not bookings:
+            return
+
+        # Create summary embed
+        embed = discord.Embed(
+            title=f"📅 Planning de demain — {tomorrow_label}",
+            description=f"Vous avez **{len(bookings)}** session(s) prévue(s) demain",
+            color=config.BOT_COLOR
+        )
+
+        for booking_id, scheduled_at, duration_minutes, booking_type, client_name in bookings:
+            type_emoji = "🆓" if booking_type == config.BOOKING_TYPE_FREE else "💰"
+            embed.add_field(
+                name=f"{type_emoji} {fmt_time(scheduled_at)} - {client_name}",
+                value=f"Durée: {duration_minutes}min | ID: `{booking_id}`",
+                inline=False
             )
 
-            for booking in bookings:
-                client = session.query(Client).filter_by(id=booking.client_id).first()
-                if client:
-                    type_emoji = "🆓" if booking.booking_type == config.BOOKING_TYPE_FREE else "💰"
-                    embed.add_field(
-                        name=f"{type_emoji} {booking.scheduled_at.strftime('%H:%M')} - {client.discord_name}",
-                        value=f"Durée: {booking.duration_minutes}min | ID: `{booking.id}`",
-                        inline=False
-                    )
-
-            embed.set_footer(text="Bonne séance de coaching demain! 🎮")
-            embed.timestamp = datetime.utcnow()
+        embed.set_footer(text="Bonne séance de coaching demain! 🎮")
+        embed.timestamp = now
 
-            # Send to coaches (find them by role)
-            guild = self.bot.get_guild(config.GUILD_ID)
-            if guild:
-                coach_role = guild.get_role(config.COACH_ROLE_ID)
-                if coach_role:
-                    for member in coach_role.members:
-                        try:
-                            await member.send(embed=embed)
-                        except discord.Forbidden:
-                            print(f"❌ Cannot send DM to coach {member.name}")
+        # Send to coaches (find them by role)
+        guild = self.bot.get_guild(config.GUILD_ID)
+        if not guild:
+            return
 
+        await broadcast_dm(get_coaches(guild), embed=embed)
 
     @tasks.loop(hours=12)  # Check twice a day
     async def check_pack_expiry(self):
@@ -241,33 +511,33 @@ class Reminders(commands.Cog):
         now = datetime.now(config.TIMEZONE)
         expiry_threshold = now - timedelta(days=config.PACK_EXPIRY_DAYS)
 
-        with get_session() as session:
-            expired_bookings = session.query(Booking).filter(
-                Booking.status == config.STATUS_PENDING_SCHEDULE,
-                Booking.created_at <= expiry_threshold
-            ).all()
-
-            for booking in expired_bookings:
-                booking.status = config.STATUS_CANCELLED
-                print(f"⚠️ Pack session {booking.id} expired after {config.PACK_EXPIRY_DAYS} days — cancelled")
-
-            if expired_bookings:
-                session.commit()
-                # Notify coaches if any packs expired
-                guild = self.bot.get_guild(config.GUILD_ID)
-                if guild and config.LOG_CHANNEL_ID:
-                    log_channel = guild.get_channel(config.LOG_CHANNEL_ID)
-                    if log_channel:
-                        embed = discord.Embed(
-                            title="⚠️ Sessions pack expirées",
-                            description=f"**{len(expired_bookings)}** session(s) pack ont expiré après {config.PACK_EXPIRY_DAYS} jours sans être planifiées et ont été annulées.",
-                            color=config.WARNING_COLOR
-                        )
-                        embed.timestamp = datetime.utcnow()
-                        try:
-                            await log_channel.send(embed=embed)
-                        except discord.Forbidden:
-                            pass
+        async with get_async_session() as session:
+            expired_ids = (await session.execute(
+                _EXPIRE_PACKS,
+                {"expiry_threshold": expiry_threshold},
+                execution_options={"synchronize_session": False}
+            )).scalars().all()
+
+        if not expired_ids:
+            return
+
+        print(f"⚠️ {len(expired_ids)} pack session(s) expired after {config.PACK_EXPIRY_DAYS} days — cancelled: {expired_ids}")
+
+        # Notify coaches if any packs expired
+        guild = self.bot.get_guild(config.GUILD_ID)
+        if guild and config.LOG_CHANNEL_ID:
+            log_channel = guild.get_channel(config.LOG_CHANNEL_ID)
+            if log_channel:
+                embed = discord.Embed(
+                    title="⚠️ Sessions pack expirées",
+                    description=f"**{len(expired_ids)}** session(s) pack ont expiré après {config.PACK_EXPIRY_DAYS} jours sans être planifiées et ont été annulées.",
+                    color=config.WARNING_COLOR
+                )
+                embed.timestamp = now
+                try:
+                    await log_channel.send(embed=embed)
+                except discord.Forbidden:
+                    pass
 
     @check_pack_expiry.before_loop
     async def before_check_pack_expiry(self):
@@ -4,12 +4,17 @@ Stats Cog - Statistics and client information
 import discord
 from discord.ext import commands
 from discord import app_commands
-from datetime import datetime
+from collections import Counter
+from datetime import datetime, timezone
 from typing import Optional
+from sqlalchemy import func, select
 import config
-from database import get_session, Booking, Client, Note, Feedback
+from database import get_async_session, Booking, Client, Note, Feedback
 from utils.embeds import create_error_embed, create_info_embed
-from utils.permissions import is_coach
+from utils.permissions import coach_check
+
+# Characters of each recent note shown in /stats
+NOTE_PREVIEW_LENGTH = 80
 
 
 class Stats(commands.Cog):
@@ -28,6 +33,7 @@ class Stats(commands.Cog):
 
     @app_commands.command(name="stats", description="[Coach] Voir les statistiques d'un client")
     @app_commands.describe(user="Le client à consulter")
+    @coach_check()
     async def stats(
         self,
         interaction: discord.Interaction,
@@ -36,107 +42,157 @@ class Stats(commands.Cog):
         """
         View client statistics
         """
-        if not is_coach(interaction.user) and not interaction.user.guild_permissions.administrator:
-            await interaction.response.send_message(
-                embed=create_error_embed("Vous devez être coach pour utiliser cette commande."),
-                ephemeral=True
-            )
-            return
-
         await interaction.response.defer()
 
-        with get_session() as session:
-            client = session.query(Client).filter_by(discord_id=str(user.id)).first()
-
-            if not client:
-                await interaction.followup.send(
-                    embed=create_error_embed(f"{user.display_name} n'a jamais réservé de coaching."),
-                    ephemeral=True
-                )
-                return
+        data = await self._compute_stats(str(user.id))
 
-            # Get all bookings
-            bookings = session.query(Booking).filter_by(client_id=client.id).all()
-
-            # Calculate statistics
-            total_sessions = len(bookings)
-            completed = len([b for b in bookings if b.status == config.STATUS_COMPLETED])
-            cancelled = len([b for b in bookings if b.status == config.STATUS_CANCELLED])
-            no_shows = len([b for b in bookings if b.status == config.STATUS_NO_SHOW])
-            free_sessions = len([b for b in bookings if b.booking_type == config.BOOKING_TYPE_FREE])
-            paid_sessions = len([b for b in bookings if b.booking_type == config.BOOKING_TYPE_PAID])
+        if data is None:
+            await interaction.followup.send(
+                embed=create_error_embed(f"{user.display_name} n'a jamais réservé de coaching."),
+                ephemeral=True
+            )
+            return
 
-            # Get feedbacks
-            feedbacks = session.query(Feedback).join(Booking).filter(Booking.client_id == client.id).all()
-            avg_rating = sum([f.rating for f in feedbacks]) / len(feedbacks) if feedbacks else 0
+        # Create embed
+        embed = discord.Embed(
+            title=f"📊 Statistiques - {data['client_name']}",
+            description=f"Client depuis le {data['client_since'].strftime('%d/%m/%Y')}",
+            color=config.BOT_COLOR
+        )
 
-            # Get notes
-            notes = session.query(Note).filter_by(client_id=client.id).order_by(Note.created_at.desc()).all()
+        # Add statistics
+        embed.add_field(
+            name="📈 Séances",
+            value=f"**Total:** {data['total_sessions']}\n"
+                  f"✅ Complétées: {data['completed']}\n"
+                  f"❌ Annulées: {data['cancelled']}\n"
+                  f"👻 No-show: {data['no_shows']}",
+            inline=True
+        )
 
-            # Create embed
-            embed = discord.Embed(
-                title=f"📊 Statistiques - {client.discord_name}",
-                description=f"Client depuis le {client.created_at.strftime('%d/%m/%Y')}",
-                color=config.BOT_COLOR
-            )
+        embed.add_field(
+            name="💰 Types de coaching",
+            value=f"🆓 Gratuit: {data['free_sessions']}\n"
+                  f"💰 Payant: {data['paid_sessions']}",
+            inline=True
+        )
 
-            # Add statistics
+        if data['feedback_count']:
+            stars = "⭐" * int(data['avg_rating'])
             embed.add_field(
-                name="📈 Séances",
-                value=f"**Total:** {total_sessions}\n"
-                      f"✅ Complétées: {completed}\n"
-                      f"❌ Annulées: {cancelled}\n"
-                      f"👻 No-show: {no_shows}",
+                name="⭐ Satisfaction",
+                value=f"{stars} ({data['avg_rating']:.1f}/5)\n"
+                      f"Basé sur {data['feedback_count']} avis",
                 inline=True
             )
 
+        upcoming = data['upcoming']
+        if upcoming:
+            upcoming_text = ""
+            for booking in upcoming:
+                type_emoji = "🆓" if booking.booking_type == config.BOOKING_TYPE_FREE else "💰"
+                upcoming_text += f"{type_emoji} {booking.scheduled_at.strftime('%d/%m à %H:%M')} (ID: `{booking.id}`)\n"
+
             embed.add_field(
-                name="💰 Types de coaching",
-                value=f"🆓 Gratuit: {free_sessions}\n"
-                      f"💰 Payant: {paid_sessions}",
-                inline=True
+                name=f"📅 Prochaines séances ({upcoming[0].total})",
+                value=upcoming_text,
+                inline=False
             )
 
-            if feedbacks:
-                stars = "⭐" * int(avg_rating)
-                embed.add_field(
-                    name="⭐ Satisfaction",
-                    value=f"{stars} ({avg_rating:.1f}/5)\n"
-                          f"Basé sur {len(feedbacks)} avis",
-                    inline=True
-                )
-
-            # Upcoming sessions
-            upcoming = [b for b in bookings if b.status == config.STATUS_CONFIRMED and b.scheduled_at > datetime.now(config.TIMEZONE)]
-            if upcoming:
-                upcoming_text = ""
-                for booking in upcoming[:3]:  # Show max 3
-                    type_emoji = "🆓" if booking.booking_type == config.BOOKING_TYPE_FREE else "💰"
-                    upcoming_text += f"{type_emoji} {booking.scheduled_at.strftime('%d/%m à %H:%M')} (ID: `{booking.id}`)\n"
+        # Recent notes
+        notes = data['notes']
+        if notes:
+            recent_notes_text = ""
+            for note in notes:
+                created_date = note.created_at.strftime('%d/%m/%Y')
+                recent_notes_text += f"📝 {created_date}: {note.preview}{'...' if note.truncated else ''}\n\n"
 
-                embed.add_field(
-                    name=f"📅 Prochaines séances ({len(upcoming)})",
-                    value=upcoming_text,
-                    inline=False
-                )
+            embed.add_field(
+                name=f"📝 Notes récentes ({notes[0].total} total)",
+                value=recent_notes_text or "Aucune note",
+                inline=False
+            )
 
-            # Recent notes
-            if notes:
-                recent_notes_text = ""
-                for note in notes[:2]:  # Show last 2 notes
-                    created_date = note.created_at.strftime('%d/%m/%Y')
-                    recent_notes_text += f"📝 {created_date}: {note.content[:80]}{'...' if len(note.content) > 80 else ''}\n\n"
+        embed.set_thumbnail(url=user.display_avatar.url)
+        embed.timestamp = datetime.now(timezone.utc)
 
-                embed.add_field(
-                    name=f"📝 Notes récentes ({len(notes)} total)",
-                    value=recent_notes_text or "Aucune note",
-                    inline=False
-                )
+        await interaction.followup.send(embed=embed)
 
-            embed.set_thumbnail(url=user.display_avatar.url)
-            embed.timestamp = datetime.utcnow()
+    async def _compute_stats(self, discord_id: str) -> Optional[dict]:
+        """
+        Run the client statistics queries
 
-            await interaction.followup.send(embed=embed)
+        Returns:
+            The statistics, or None if the user never booked
+        """
+        async with get_async_session() as session:
+            client = (await session.execute(
+                select(Client.id, Client.discord_name, Client.created_at).where(Client.discord_id == discord_id)
+            )).first()
+            if not client:
+                return None
+
+            # Per (status, type) counts in a single GROUP BY
+            tally = (await session.execute(
+                select(Booking.status, Booking.booking_type, func.count(Booking.id))
+                .where(Booking.client_id == client.id)
+                .group_by(Booking.status, Booking.booking_type)
+            )).all()
+
+            status_counts = Counter()
+            type_counts = Counter()
+            for status, booking_type, count in tally:
+                status_counts[status] += count
+                type_counts[booking_type] += count
+
+            # Feedback count and average in one aggregate query
+            feedback_count, avg_rating = (await session.execute(
+                select(func.count(Feedback.id), func.coalesce(func.avg(Feedback.rating), 0))
+                .join(Booking, Feedback.booking_id == Booking.id)
+                .where(Booking.client_id == client.id)
+            )).one()
+
+            # Next 3 upcoming sessions plus their total count (window function)
+            # scheduled_at is stored as naive local time
+            now = datetime.now(config.TIMEZONE).replace(tzinfo=None)
+            upcoming = (await session.execute(
+                select(Booking.id, Booking.booking_type, Booking.scheduled_at, func.count().over().label("total"))
+                .where(
+                    Booking.client_id == client.id,
+                    Booking.status == config.STATUS_CONFIRMED,
+                    Booking.scheduled_at > now
+                )
+                .order_by(Booking.scheduled_at)
+                .limit(3)
+            )).all()
+
+            # Last 2 notes, cut to their preview in SQL, plus the total count (window function)
+            notes = (await session.execute(
+                select(
+                    func.substr(Note.content, 1, NOTE_PREVIEW_LENGTH).label("preview"),
+                    (func.length(Note.content) > NOTE_PREVIEW_LENGTH).label("truncated"),
+                    Note.created_at,
+                    func.count().over().label("total")
+                )
+                .where(Note.client_id == client.id)
+                .order_by(Note.created_at.desc())
+                .limit(2)
+            )).all()
+
+        return {
+            "client_name": client.discord_name,
+            "client_since": client.created_at,
+            "total_sessions": status_counts.total(),
+            "completed": status_counts[config.STATUS_COMPLETED],
+            "cancelled": status_counts[config.STATUS_CANCELLED],
+            "no_shows": status_counts[config.STATUS_NO_SHOW],
+            "free_sessions": type_counts[config.BOOKING_TYPE_FREE],
+            "paid_sessions": type_counts[config.BOOKING_TYPE_PAID],
+            "feedback_count": feedback_count,
+            "avg_rating": float(avg_rating),
+            "upcoming": upcoming,
+            "notes": notes,
+        }
 
     @app_commands.command(name="notes", description="[Coach] Gérer les notes d'un client")
     @app_commands.describe(
@@ -147,6 +203,7 @@ class Stats(commands.Cog):
         app_commands.Choice(name="Voir toutes les notes", value="view"),
         app_commands.Choice(name="Ajouter une note", value="add")
     ])
+    @coach_check()
     async def notes(
         self,
         interaction: discord.Interaction,
@@ -156,54 +213,57 @@ class Stats(commands.Cog):
         """
         Manage client notes
         """
-        if not is_coach(interaction.user) and not interaction.user.guild_permissions.administrator:
+        async with get_async_session() as session:
+            client = (await session.execute(
+                select(Client.id, Client.discord_name).where(Client.discord_id == str(user.id))
+            )).first()
+
+            notes = []
+            if client and action == "view":
+                # Last 10 notes plus the total count (window function)
+                notes = (await session.execute(
+                    select(Note.content, Note.created_at, func.count().over().label("total"))
+                    .where(Note.client_id == client.id)
+                    .order_by(Note.created_at.desc())
+                    .limit(10)
+                )).all()
+
+        if not client:
             await interaction.response.send_message(
-                embed=create_error_embed("Vous devez être coach pour utiliser cette commande."),
+                embed=create_error_embed(f"{user.display_name} n'a jamais réservé de coaching."),
                 ephemeral=True
             )
             return
 
-        with get_session() as session:
-            client = session.query(Client).filter_by(discord_id=str(user.id)).first()
+        if action == "view":
+            await interaction.response.defer()
 
-            if not client:
-                await interaction.response.send_message(
-                    embed=create_error_embed(f"{user.display_name} n'a jamais réservé de coaching."),
-                    ephemeral=True
+            if not notes:
+                await interaction.followup.send(
+                    embed=create_info_embed(f"Aucune note pour {client.discord_name}.")
                 )
                 return
 
-            if action == "view":
-                await interaction.response.defer()
-
-                notes = session.query(Note).filter_by(client_id=client.id).order_by(Note.created_at.desc()).all()
-
-                if not notes:
-                    await interaction.followup.send(
-                        embed=create_info_embed(f"Aucune note pour {client.discord_name}.")
-                    )
-                    return
+            embed = discord.Embed(
+                title=f"📝 Notes - {client.discord_name}",
+                description=f"**{notes[0].total}** note(s) enregistrée(s)",
+                color=config.BOT_COLOR
+            )
 
-                embed = discord.Embed(
-                    title=f"📝 Notes - {client.discord_name}",
-                    description=f"**{len(notes)}** note(s) enregistrée(s)",
-                    color=config.BOT_COLOR
+            for note in notes:
+                embed.add_field(
+                    name=f"📅 {note.created_at.strftime('%d/%m/%Y à %H:%M')}",
+                    value=note.content,
+                    inline=False
                 )
 
-                for note in notes[:10]:  # Show last 10 notes
-                    embed.add_field(
-                        name=f"📅 {note.created_at.strftime('%d/%m/%Y à %H:%M')}",
-                        value=note.content,
-                        inline=False
-                    )
-
-                embed.timestamp = datetime.utcnow()
-                await interaction.followup.send(embed=embed)
+            embed.timestamp = datetime.now(timezone.utc)
+            await interaction.followup.send(embed=embed)
 
-            elif action == "add":
-                # Show modal for adding note
-                modal = AddNoteModal(client=client, user=user)
-                await interaction.response.send_modal(modal)
+        elif action == "add":
+            # Show modal for adding note
+            modal = AddNoteModal(client=client, user=user)
+            await interaction.response.send_modal(modal)
 
 
 class AddNoteModal(discord.ui.Modal):
@@ -211,7 +271,12 @@ class AddNoteModal(discord.ui.Modal):
     Modal for adding a note about a client
     """
 
-    def __init__(self, client: Client, user: discord.Member):
+    def __init__(self, client, user: discord.Member):
+        """
+        Args:
+            client: Client row, with at least id and discord_name
+            user: The client's Discord member
+        """
         super().__init__(title=f"Ajouter une note - {client.discord_name}")
         self.client = client
         self.user = user
@@ -231,14 +296,12 @@ class AddNoteModal(discord.ui.Modal):
         """
         note_content = self.note_input.value.strip()
 
-        with get_session() as session:
-            new_note = Note(
+        async with get_async_session() as session:
+            session.add(Note(
                 client_id=self.client.id,
                 content=note_content,
                 created_by_discord_id=str(interaction.user.id)
-            )
-            session.add(new_note)
-            session.commit()
+            ))
 
         embed = discord.Embed(
             title="✅ Note ajoutée",
@@ -246,7 +309,7 @@ class AddNoteModal(discord.ui.Modal):
             color=config.SUCCESS_COLOR
         )
         embed.add_field(name="Contenu", value=note_content[:200], inline=False)
-        embed.timestamp = datetime.utcnow()
+        embed.timestamp = datetime.now(timezone.utc)
 
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
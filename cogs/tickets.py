@@ -2,21 +2,46 @@
 Tickets Cog - Manages ticket system and booking flow
 """
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
-from datetime import datetime, timedelta
-from typing import Optional
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
 import asyncio
+from sqlalchemy import delete, select, update
 import config
-from database import get_session, Client, Booking
+from database import get_session, get_async_session, get_client_id, invalidate_client_id, Client, Booking, TicketState
 from utils.embeds import (
     create_error_embed, create_success_embed, create_info_embed,
     create_booking_embed, create_ticket_embed, create_ticket_welcome_embed
 )
-from utils.permissions import is_coach, coach_only
+from utils.permissions import coach_check, coach_only, get_coaches, is_coach
+from utils.ratelimit import broadcast_dm
 from utils.google_calendar import GoogleCalendarManager
 from views.booking_views import BookingTypeView, DateSelectorView, CalendarSlotsView, SessionQuantityView, CoachTicketControlsView, StudentBookingControlsView
 
+# Longest a ticket creation may hold the user's lock before the user can retry
+TICKET_CREATION_TIMEOUT = 15  # seconds
+# Channel deletions in flight at once in /clear-tickets
+TICKET_DELETE_CONCURRENCY = 5
+# Booking flow states untouched for this long are dropped
+TICKET_STATE_TTL = timedelta(hours=24)
+
+# Ticket channel permission templates, shared by every ticket (discord.py only reads them)
+_OW_DENY_READ = discord.PermissionOverwrite(read_messages=False)
+# The ticket owner and the coaches
+_OW_MEMBER = discord.PermissionOverwrite(
+    read_messages=True,
+    send_messages=True,
+    embed_links=True,
+    attach_files=True
+)
+_OW_BOT = discord.PermissionOverwrite(
+    read_messages=True,
+    send_messages=True,
+    embed_links=True,
+    manage_messages=True
+)
+
 
 class Tickets(commands.Cog):
     """
@@ -26,10 +51,23 @@ class Tickets(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
         self.calendar_manager = GoogleCalendarManager()
-        self.active_tickets = {}  # Store ticket states
-        self.ticket_creation_locks = {}  # Lock per user ID to prevent race conditions
-        self._global_ticket_lock = asyncio.Lock()  # Global lock to serialize all ticket checks
-        self._creating_tickets = set()  # Track users currently creating tickets
+        self.active_tickets = {}  # Store ticket states, backed by the ticket_states table
+        self.ticket_creation_locks: Dict[int, asyncio.Lock] = {}  # Lock per user ID to prevent race conditions
+        self._background_tasks = set()  # Fire-and-forget tasks, referenced until done
+        # user id -> ticket creation still running after the user stopped waiting for it
+        self._slow_ticket_creations: Dict[int, asyncio.Task] = {}
+        # user id -> ticket channels the user can read, and channel id -> those user ids.
+        # Built from the category on first use, then kept up to date incrementally
+        self._ticket_index: Dict[int, List[discord.TextChannel]] = {}
+        self._ticket_owners: Dict[int, List[int]] = {}
+        self._ticket_index_ready = False
+        self.purge_ticket_states.start()
+
+    def cog_unload(self):
+        """
+        Stop the task when cog is unloaded
+        """
+        self.purge_ticket_states.cancel()
 
     async def cog_load(self):
         """
@@ -37,19 +75,97 @@ class Tickets(commands.Cog):
         """
         print("📋 Tickets cog loaded")
 
+    @tasks.loop(hours=24)
+    async def purge_ticket_states(self):
+        """
+        Forget booking flows abandoned long ago
+        """
+        async with get_async_session() as session:
+            await session.execute(
+                delete(TicketState).where(TicketState.updated_at < self._utcnow() - TICKET_STATE_TTL)
+            )
+
+    @purge_ticket_states.before_loop
+    async def before_purge_ticket_states(self):
+        """
+        Wait until the bot is ready (the database is initialized before the gateway connects)
+        """
+        await self.bot.wait_until_ready()
+
+    @staticmethod
+    def _utcnow() -> datetime:
+        # TicketState.updated_at is stored as naive UTC
+        return datetime.now(timezone.utc).replace(tzinfo=None)
+
+    async def _state_get(self, ticket_channel_id: int) -> Optional[dict]:
+        """
+        Return the booking state of a ticket, reloading it from the database
+        when the cog was reloaded or the bot restarted mid-booking
+        """
+        data = self.active_tickets.get(ticket_channel_id)
+        if data is not None:
+            return data
+
+        async with get_async_session() as session:
+            state = await session.get(TicketState, str(ticket_channel_id))
+        if state is None or state.updated_at < self._utcnow() - TICKET_STATE_TTL:
+            return None
+
+        channel = self.bot.get_channel(ticket_channel_id)
+        if channel is None:
+            return None
+        user = channel.guild.get_member(int(state.user_id))
+        if user is None:
+            try:
+                user = await channel.guild.fetch_member(int(state.user_id))
+            except discord.HTTPException:
+                return None
+
+        data = {
+            'user': user,
+            'booking_type': state.booking_type,
+            'quantity': state.quantity,
+            'reschedule_booking_id': state.reschedule_booking_id,
+            'old_date': state.old_date
+        }
+        # Keep the keys the flow checks with .get() absent, as when set in memory
+        data = {key: value for key, value in data.items() if value is not None}
+        self.active_tickets[ticket_channel_id] = data
+        return data
+
+    async def _state_set(self, ticket_channel_id: int, data: dict):
+        """
+        Store the booking state of a ticket, in memory and in the database
+        """
+        self.active_tickets[ticket_channel_id] = data
+        async with get_async_session() as session:
+            await session.merge(TicketState(
+                ticket_channel_id=str(ticket_channel_id),
+                user_id=str(data['user'].id),
+                booking_type=data['booking_type'],
+                quantity=data.get('quantity'),
+                reschedule_booking_id=data.get('reschedule_booking_id'),
+                old_date=data.get('old_date'),
+                updated_at=self._utcnow()
+            ))
+
+    async def _state_delete(self, ticket_channel_id: int):
+        """
+        Drop the booking state of a ticket, once booked or when the channel is deleted
+        """
+        self.active_tickets.pop(ticket_channel_id, None)
+        async with get_async_session() as session:
+            await session.execute(
+                delete(TicketState).where(TicketState.ticket_channel_id == str(ticket_channel_id))
+            )
+
     @app_commands.command(name="setup-booking", description="[Coach] Configure le message de réservation")
     @app_commands.default_permissions(administrator=True)
+    @coach_check("Vous n'avez pas la permission d'utiliser cette commande.")
     async def setup_booking(self, interaction: discord.Interaction):
         """
         Setup the booking button message (admin/coach only)
         """
-        if not is_coach(interaction.user) and not interaction.user.guild_permissions.administrator:
-            await interaction.response.send_message(
-                embed=create_error_embed("Vous n'avez pas la permission d'utiliser cette commande."),
-                ephemeral=True
-            )
-            return
-
         embed = discord.Embed(
             title="🎮 Réservation de Coaching",
             description="Bienvenue sur **Deg Coaching**!\n\n"
@@ -161,22 +277,149 @@ class Tickets(commands.Cog):
                     ephemeral=True
                 )
 
+    @staticmethod
+    def _is_ticket_channel(channel) -> bool:
+        return (
+            isinstance(channel, discord.TextChannel)
+            and channel.category_id == config.TICKET_CATEGORY_ID
+            and channel.name.startswith("ticket-")
+        )
+
+    @staticmethod
+    def _ticket_members(channel: discord.TextChannel) -> List[int]:
+        """
+        Members with read_messages explicitly allowed own the ticket (or were added to it)
+
+        channel.overwrites rebuilds its dict on every access, so it is read once.
+        Members missing from the cache come back as discord.Object and still count.
+        """
+        return [
+            target.id for target, overwrite in channel.overwrites.items()
+            if overwrite.read_messages is True and (
+                isinstance(target, discord.Member)
+                or (isinstance(target, discord.Object) and target.type is discord.Member)
+            )
+        ]
+
+    @staticmethod
+    def _ticket_owner_id(channel: discord.TextChannel) -> Optional[int]:
+        """
+        ID of the member the ticket was created for: the only member given the
+        owner overwrite template (members added later only get read/send)
+        """
+        for target, overwrite in channel.overwrites.items():
+            if isinstance(target, discord.Member) and (target.bot or is_coach(target)):
+                continue
+            if overwrite == _OW_MEMBER and (
+                isinstance(target, discord.Member)
+                or (isinstance(target, discord.Object) and target.type is discord.Member)
+            ):
+                return target.id
+        return None
+
+    def _index_ticket(self, channel: discord.TextChannel):
+        """
+        (Re)index one ticket channel from its current overwrites
+        """
+        self._unindex_ticket(channel.id)
+        members = self._ticket_members(channel)
+        self._ticket_owners[channel.id] = members
+        for user_id in members:
+            self._ticket_index.setdefault(user_id, []).append(channel)
+
+    def _unindex_ticket(self, channel_id: int):
+        """
+        Remove one ticket channel from the index, no-op if unknown
+        """
+        for user_id in self._ticket_owners.pop(channel_id, ()):
+            channels = [c for c in self._ticket_index.get(user_id, ()) if c.id != channel_id]
+            if channels:
+                self._ticket_index[user_id] = channels
+            else:
+                self._ticket_index.pop(user_id, None)
+
+    def _ensure_ticket_index(self, category: discord.CategoryChannel):
+        """
+        Build the index with a single walk of the category on first use (cold start)
+        """
+        if self._ticket_index_ready:
+            return
+
+        self._ticket_index = {}
+        self._ticket_owners = {}
+        for channel in category.channels:
+            if self._is_ticket_channel(channel):
+                self._index_ticket(channel)
+        self._ticket_index_ready = True
+
+    def get_user_tickets(self, category: discord.CategoryChannel, user_id: int) -> List[discord.TextChannel]:
+        """
+        Return the ticket channels of a user, from the in-memory index
+        """
+        self._ensure_ticket_index(category)
+        return self._ticket_index.get(user_id, [])
+
+    def ticket_count(self, category: discord.CategoryChannel) -> int:
+        """
+        Return the number of open ticket channels
+        """
+        self._ensure_ticket_index(category)
+        return len(self._ticket_owners)
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        """
+        Rebuild the index after every new gateway session (not on resume): the guild
+        cache is rebuilt then, and channels deleted while disconnected sent no event
+        """
+        self._ticket_index_ready = False
+
+    @commands.Cog.listener()
+    async def on_guild_channel_create(self, channel: discord.abc.GuildChannel):
+        """
+        Index ticket channels created outside create_ticket
+        """
+        if self._ticket_index_ready and self._is_ticket_channel(channel):
+            self._index_ticket(channel)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_update(self, before: discord.abc.GuildChannel, after: discord.abc.GuildChannel):
+        """
+        Re-index a ticket when its permissions, name or category change
+        """
+        if not self._ticket_index_ready:
+            return
+        if self._is_ticket_channel(after):
+            self._index_ticket(after)
+        else:
+            self._unindex_ticket(after.id)
+
+    @commands.Cog.listener()
+    async def on_guild_channel_delete(self, channel: discord.abc.GuildChannel):
+        """
+        Drop deleted ticket channels from the index (buttons, manual deletion)
+        """
+        self._unindex_ticket(channel.id)
+        if self._is_ticket_channel(channel):
+            await self._state_delete(channel.id)
+
     async def _close_ticket(self, interaction: discord.Interaction, channel: discord.TextChannel = None):
         """
         Close a ticket channel
         """
         target_channel = channel or interaction.channel
         embed = create_info_embed(
-            "🔒 Fermeture du ticket dans 5 secondes...\n"
+            f"🔒 Fermeture du ticket dans {config.TICKET_CLOSE_DELAY} secondes...\n"
             "Le salon sera supprimé."
         )
         await interaction.response.send_message(embed=embed)
 
-        # Wait 5 seconds then delete
-        await discord.utils.sleep_until(discord.utils.utcnow() + timedelta(seconds=5))
+        # Leave the user time to read the notice, then delete
+        await asyncio.sleep(config.TICKET_CLOSE_DELAY)
 
         try:
             await target_channel.delete(reason=f"Ticket fermé par {interaction.user}")
+            self._unindex_ticket(target_channel.id)
         except discord.Forbidden:
             await interaction.followup.send(
                 embed=create_error_embed("Je n'ai pas la permission de supprimer ce salon."),
@@ -198,11 +441,8 @@ class Tickets(commands.Cog):
             return
 
         # Find user's ticket channel
-        user_ticket = None
-        for channel in category.channels:
-            if channel.name.startswith(f"ticket-{user.name.lower()}"):
-                user_ticket = channel
-                break
+        user_tickets = self.get_user_tickets(category, user.id)
+        user_ticket = user_tickets[0] if user_tickets else None
 
         if not user_ticket:
             await interaction.response.send_message(
@@ -219,6 +459,7 @@ class Tickets(commands.Cog):
 
         try:
             await user_ticket.delete(reason=f"Ticket fermé par {interaction.user}")
+            self._unindex_ticket(user_ticket.id)
         except discord.Forbidden:
             await interaction.followup.send(
                 embed=create_error_embed("Permissions insuffisantes pour supprimer ce ticket."),
@@ -247,6 +488,7 @@ class Tickets(commands.Cog):
     @app_commands.describe(
         user="L'utilisateur dont vous voulez supprimer tous les tickets"
     )
+    @coach_check("Seuls les coachs peuvent utiliser cette commande.")
     async def clear_tickets(
         self,
         interaction: discord.Interaction,
@@ -255,14 +497,6 @@ class Tickets(commands.Cog):
         """
         Delete all tickets for a specific user (coach only)
         """
-        # Check if user is coach
-        if not is_coach(interaction.user) and not interaction.user.guild_permissions.administrator:
-            await interaction.response.send_message(
-                embed=create_error_embed("Seuls les coachs peuvent utiliser cette commande."),
-                ephemeral=True
-            )
-            return
-
         await interaction.response.defer(ephemeral=True)
 
         guild = interaction.guild
@@ -276,17 +510,7 @@ class Tickets(commands.Cog):
             return
 
         # Find all tickets for this user
-        user_tickets = []
-        for channel in category.channels:
-            if not isinstance(channel, discord.TextChannel):
-                continue
-
-            if channel.name.startswith("ticket-"):
-                # Check if user has explicit permissions in this channel
-                if user in channel.overwrites:
-                    user_overwrite = channel.overwrites[user]
-                    if user_overwrite.read_messages is True:
-                        user_tickets.append(channel)
+        user_tickets = list(self.get_user_tickets(category, user.id))
 
         if not user_tickets:
             await interaction.followup.send(
@@ -295,18 +519,24 @@ class Tickets(commands.Cog):
             )
             return
 
-        # Delete all tickets
-        deleted_count = 0
-        failed_tickets = []
+        # Delete all tickets concurrently, a few at a time
+        semaphore = asyncio.Semaphore(TICKET_DELETE_CONCURRENCY)
+        reason = f"Tous les tickets supprimés par {interaction.user} via /clear-tickets"
 
-        for ticket in user_tickets:
-            try:
-                await ticket.delete(reason=f"Tous les tickets supprimés par {interaction.user} via /clear-tickets")
-                deleted_count += 1
-            except discord.Forbidden:
-                failed_tickets.append(ticket.name)
-            except Exception as e:
-                failed_tickets.append(f"{ticket.name} (erreur: {str(e)})")
+        async def delete_one(ticket):
+            async with semaphore:
+                try:
+                    await ticket.delete(reason=reason)
+                    self._unindex_ticket(ticket.id)
+                    return None
+                except discord.Forbidden:
+                    return ticket.name
+                except Exception as e:
+                    return f"{ticket.name} (erreur: {str(e)})"
+
+        results = await asyncio.gather(*(delete_one(ticket) for ticket in user_tickets))
+        failed_tickets = [failure for failure in results if failure is not None]
+        deleted_count = len(results) - len(failed_tickets)
 
         # Send result
         if deleted_count > 0:
@@ -343,18 +573,13 @@ class Tickets(commands.Cog):
         # CRITICAL: Double-check if non-coach user already has a ticket
         # This prevents race conditions from spam clicking
         if not is_coach(user):
-            for channel in category.channels:
-                if not isinstance(channel, discord.TextChannel):
-                    continue
-                if channel.name.startswith("ticket-"):
-                    if user in channel.overwrites:
-                        user_overwrite = channel.overwrites[user]
-                        if user_overwrite.read_messages is True:
-                            print(f"⚠️ User {user.name} already has ticket {channel.name}, aborting creation")
-                            return None  # User already has a ticket, abort
+            existing = self.get_user_tickets(category, user.id)
+            if existing:
+                print(f"⚠️ User {user.name} already has ticket {existing[0].name}, aborting creation")
+                return None  # User already has a ticket, abort
 
         # Find ticket number
-        ticket_number = len([c for c in category.channels if c.name.startswith("ticket-")]) + 1
+        ticket_number = self.ticket_count(category) + 1
         channel_name = config.TICKET_NAME_FORMAT.format(
             username=user.name.lower().replace(" ", "-"),
             number=ticket_number
@@ -365,28 +590,13 @@ class Tickets(commands.Cog):
 
         # Create overwrites
         overwrites = {
-            guild.default_role: discord.PermissionOverwrite(read_messages=False),
-            user: discord.PermissionOverwrite(
-                read_messages=True,
-                send_messages=True,
-                embed_links=True,
-                attach_files=True
-            ),
-            guild.me: discord.PermissionOverwrite(
-                read_messages=True,
-                send_messages=True,
-                embed_links=True,
-                manage_messages=True
-            )
+            guild.default_role: _OW_DENY_READ,
+            user: _OW_MEMBER,
+            guild.me: _OW_BOT
         }
 
         if coach_role:
-            overwrites[coach_role] = discord.PermissionOverwrite(
-                read_messages=True,
-                send_messages=True,
-                embed_links=True,
-                attach_files=True
-            )
+            overwrites[coach_role] = _OW_MEMBER
 
         try:
             # Create channel
@@ -395,6 +605,8 @@ class Tickets(commands.Cog):
                 overwrites=overwrites,
                 reason=f"Ticket créé par {user}"
             )
+            # Index right away, the channel create event may arrive after the next click
+            self._index_ticket(ticket_channel)
 
             # Send welcome message
             embed = create_ticket_welcome_embed()
@@ -418,8 +630,10 @@ class Tickets(commands.Cog):
             # Only coaches will see the buttons work (permissions check)
             await ticket_channel.send(embed=coach_embed, view=coach_view)
 
-            # Notify coaches about new ticket
-            await self.notify_coaches_new_ticket(user, ticket_channel)
+            # Notify coaches about new ticket without making the user wait for the DMs
+            task = asyncio.create_task(self.notify_coaches_new_ticket(user, ticket_channel))
+            self._background_tasks.add(task)
+            task.add_done_callback(self._background_tasks.discard)
 
             return ticket_channel
 
@@ -434,7 +648,7 @@ class Tickets(commands.Cog):
         self,
         interaction: discord.Interaction,
         booking_type: str,
-        user: discord.Member
+        user: Optional[discord.Member]
     ):
         """
         Handle booking type selection
@@ -442,13 +656,27 @@ class Tickets(commands.Cog):
         Args:
             interaction: The interaction
             booking_type: Selected booking type (gratuit/payant)
-            user: The user who is booking
+            user: The user who is booking (None: the ticket owner, who must be the one clicking)
         """
-        # Store booking type for this ticket
-        self.active_tickets[interaction.channel.id] = {
+        # The persistent view registered at startup doesn't know the ticket owner,
+        # find it from the channel so nobody else can book in their name
+        if user is None:
+            if self._ticket_owner_id(interaction.channel) != interaction.user.id:
+                await interaction.response.send_message(
+                    embed=create_error_embed("Seul le créateur du ticket peut choisir le type de coaching."),
+                    ephemeral=True
+                )
+                return
+            user = interaction.user
+
+        # Store booking type for this ticket, free coaching is always a single session
+        ticket_data = {
             'user': user,
             'booking_type': booking_type
         }
+        if booking_type != config.BOOKING_TYPE_PAID:
+            ticket_data['quantity'] = 1
+        await self._state_set(interaction.channel.id, ticket_data)
 
         # If paid coaching, ask for quantity first
         if booking_type == config.BOOKING_TYPE_PAID:
@@ -459,8 +687,7 @@ class Tickets(commands.Cog):
             view = SessionQuantityView(cog=self, user=user)
             await interaction.response.edit_message(embed=embed, view=view)
         else:
-            # For free coaching, go directly to date selection with quantity = 1
-            self.active_tickets[interaction.channel.id]['quantity'] = 1
+            # For free coaching, go directly to date selection
             embed = create_info_embed(
                 f"Vous avez sélectionné: **Coaching Gratuit**\n\n"
                 f"Sélectionnez une date pour voir les créneaux disponibles."
@@ -483,9 +710,10 @@ class Tickets(commands.Cog):
             user: The user who is booking
         """
         # Store quantity for this ticket
-        ticket_data = self.active_tickets.get(interaction.channel.id)
+        ticket_data = await self._state_get(interaction.channel.id)
         if ticket_data:
             ticket_data['quantity'] = quantity
+            await self._state_set(interaction.channel.id, ticket_data)
 
         # Show date selector
         embed = create_info_embed(
@@ -513,7 +741,7 @@ class Tickets(commands.Cog):
         # Defer to show loading state
         await interaction.response.defer()
 
-        ticket_data = self.active_tickets.get(ticket_channel_id)
+        ticket_data = await self._state_get(ticket_channel_id)
         if not ticket_data:
             await interaction.followup.edit_message(
                 message_id=interaction.message.id,
@@ -525,15 +753,8 @@ class Tickets(commands.Cog):
         # Get duration based on booking type
         duration = config.FREE_COACHING_DURATION if ticket_data['booking_type'] == config.BOOKING_TYPE_FREE else config.PAID_COACHING_DURATION
 
-        # Get available slots from Google Calendar
-        start_of_day = selected_date.replace(hour=0, minute=0, second=0, microsecond=0)
-        end_of_day = selected_date.replace(hour=23, minute=59, second=59, microsecond=999999)
-
-        slots = self.calendar_manager.get_available_slots(
-            start_date=start_of_day,
-            end_date=end_of_day,
-            duration_minutes=duration
-        )
+        # Get available slots from Google Calendar (cached briefly per day)
+        slots = await self.calendar_manager.get_day_slots(selected_date, duration_minutes=duration)
 
         if not slots:
             embed = create_error_embed(
@@ -581,7 +802,7 @@ class Tickets(commands.Cog):
         """
         await interaction.response.defer()
 
-        ticket_data = self.active_tickets.get(ticket_channel_id)
+        ticket_data = await self._state_get(ticket_channel_id)
         if not ticket_data:
             await interaction.followup.edit_message(
                 message_id=interaction.message.id,
@@ -599,110 +820,30 @@ class Tickets(commands.Cog):
 
         # Check if this is a reschedule
         if reschedule_booking_id:
-            # Handle rescheduling
-            with get_session() as session:
-                booking = session.query(Booking).filter_by(id=reschedule_booking_id).first()
+            # Handle rescheduling, the calendar calls run between two short transactions
+            async with get_async_session() as session:
+                booking = (await session.execute(
+                    select(Booking.google_event_id, Booking.scheduled_at).where(Booking.id == reschedule_booking_id)
+                )).first()
 
-                if not booking:
-                    await interaction.followup.send(
-                        embed=create_error_embed("Réservation introuvable."),
-                        ephemeral=True
-                    )
-                    return
-
-                # Delete old Google Calendar event
-                if booking.google_event_id:
-                    try:
-                        self.calendar_manager.delete_event(booking.google_event_id)
-                    except Exception as e:
-                        print(f"❌ Error deleting old calendar event: {e}")
-
-                # Create new Google Calendar event
-                new_event_id = self.calendar_manager.create_booking_event(
-                    start_time=selected_slot,
-                    duration_minutes=duration,
-                    booking_type=booking_type,
-                    client_name=user.display_name,
-                    discord_id=str(user.id)
-                )
-
-                if not new_event_id:
-                    await interaction.followup.send(
-                        embed=create_error_embed("❌ Erreur lors de la création du nouvel événement."),
-                        ephemeral=True
-                    )
-                    return
-
-                # Update booking
-                booking.scheduled_at = selected_slot
-                booking.google_event_id = new_event_id
-                session.commit()
-
-                # Send confirmation
-                embed = discord.Embed(
-                    title="✅ Réservation reportée",
-                    description=f"Votre session a été reportée avec succès!",
-                    color=config.SUCCESS_COLOR
-                )
-                embed.add_field(
-                    name="📅 Ancienne date",
-                    value=old_date.strftime('%d/%m/%Y à %H:%M'),
-                    inline=True
-                )
-                embed.add_field(
-                    name="📅 Nouvelle date",
-                    value=selected_slot.strftime('%d/%m/%Y à %H:%M'),
-                    inline=True
+            if not booking:
+                await interaction.followup.send(
+                    embed=create_error_embed("Réservation introuvable."),
+                    ephemeral=True
                 )
-                embed.add_field(name="🆔 ID", value=f"`{reschedule_booking_id}`", inline=True)
-                embed.set_footer(text="Vous recevrez des rappels 24h et 1h avant la session")
-                embed.timestamp = datetime.utcnow()
-
-                await interaction.followup.send(embed=embed, ephemeral=True)
-
-                # Notify coaches
-                coach_role = user.guild.get_role(config.COACH_ROLE_ID)
-                if coach_role:
-                    log_channel = user.guild.get_channel(config.LOG_CHANNEL_ID)
-                    if log_channel:
-                        try:
-                            notify_embed = discord.Embed(
-                                title="📅 Réservation reportée",
-                                description=f"{user.mention} a reporté une réservation.",
-                                color=config.WARNING_COLOR
-                            )
-                            notify_embed.add_field(name="👤 Client", value=user.display_name, inline=True)
-                            notify_embed.add_field(name="📅 Ancienne date", value=old_date.strftime('%d/%m/%Y à %H:%M'), inline=True)
-                            notify_embed.add_field(name="📅 Nouvelle date", value=selected_slot.strftime('%d/%m/%Y à %H:%M'), inline=True)
-                            notify_embed.add_field(name="🆔 ID", value=f"`{reschedule_booking_id}`", inline=True)
-                            notify_embed.timestamp = datetime.utcnow()
-                            await log_channel.send(content=coach_role.mention, embed=notify_embed)
-                        except:
-                            pass
-
-                # Clean up ticket data
-                if ticket_channel_id in self.active_tickets:
-                    del self.active_tickets[ticket_channel_id]
-
                 return
 
-        # Create bookings based on quantity
-        booking_ids = []
-        created_slots = []
-
-        with get_session() as session:
-            # Get or create client
-            client = session.query(Client).filter_by(discord_id=str(user.id)).first()
-            if not client:
-                client = Client(
-                    discord_id=str(user.id),
-                    discord_name=user.display_name
-                )
-                session.add(client)
-                session.flush()
+            # Delete old Google Calendar event
+            if booking.google_event_id:
+                try:
+                    await self.calendar_manager.run(self.calendar_manager.delete_event, booking.google_event_id)
+                    self.calendar_manager.invalidate_slots(booking.scheduled_at)
+                except Exception as e:
+                    print(f"❌ Error deleting old calendar event: {e}")
 
-            # Create the first booking (with selected slot)
-            event_id = self.calendar_manager.create_booking_event(
+            # Create new Google Calendar event
+            new_event_id = await self.calendar_manager.run(
+                self.calendar_manager.create_booking_event,
                 start_time=selected_slot,
                 duration_minutes=duration,
                 booking_type=booking_type,
@@ -710,46 +851,158 @@ class Tickets(commands.Cog):
                 discord_id=str(user.id)
             )
 
-            if not event_id:
-                await interaction.followup.edit_message(
-                    message_id=interaction.message.id,
-                    embed=create_error_embed("❌ Erreur lors de la création de l'événement. Veuillez réessayer."),
-                    view=None
+            if not new_event_id:
+                await interaction.followup.send(
+                    embed=create_error_embed("❌ Erreur lors de la création du nouvel événement."),
+                    ephemeral=True
                 )
                 return
+            self.calendar_manager.invalidate_slots(selected_slot)
+
+            # Update booking
+            async with get_async_session() as session:
+                await session.execute(
+                    update(Booking)
+                    .where(Booking.id == reschedule_booking_id)
+                    # The new date gets its own reminders
+                    .values(
+                        scheduled_at=selected_slot,
+                        google_event_id=new_event_id,
+                        reminder_24h_sent=False,
+                        reminder_1h_sent=False
+                    )
+                )
+            self.bot.dispatch("booking_scheduled", reschedule_booking_id, selected_slot)
 
-            booking = Booking(
-                client_id=client.id,
-                google_event_id=event_id,
-                booking_type=booking_type,
-                scheduled_at=selected_slot,
-                duration_minutes=duration,
-                status=config.STATUS_CONFIRMED,
-                ticket_channel_id=str(ticket_channel_id),
-                notes=f"Pack de {quantity} séances - Séance 1/{quantity}" if quantity > 1 else None
+            # Send confirmation
+            embed = discord.Embed(
+                title="✅ Réservation reportée",
+                description=f"Votre session a été reportée avec succès!",
+                color=config.SUCCESS_COLOR
             )
-            session.add(booking)
-            session.flush()
-            client.total_sessions += 1
-            booking_ids.append(booking.id)
-            created_slots.append(selected_slot)
-
-            # For packs: create placeholder bookings for remaining sessions
-            for i in range(1, quantity):
-                placeholder = Booking(
-                    client_id=client.id,
-                    google_event_id=None,
+            embed.add_field(
+                name="📅 Ancienne date",
+                value=old_date.strftime('%d/%m/%Y à %H:%M'),
+                inline=True
+            )
+            embed.add_field(
+                name="📅 Nouvelle date",
+                value=selected_slot.strftime('%d/%m/%Y à %H:%M'),
+                inline=True
+            )
+            embed.add_field(name="🆔 ID", value=f"`{reschedule_booking_id}`", inline=True)
+            embed.set_footer(text="Vous recevrez des rappels 24h et 1h avant la session")
+            embed.timestamp = datetime.now(timezone.utc)
+
+            await interaction.followup.send(embed=embed, ephemeral=True)
+
+            # Notify coaches
+            coach_role = user.guild.get_role(config.COACH_ROLE_ID)
+            if coach_role:
+                log_channel = user.guild.get_channel(config.LOG_CHANNEL_ID)
+                if log_channel:
+                    try:
+                        notify_embed = discord.Embed(
+                            title="📅 Réservation reportée",
+                            description=f"{user.mention} a reporté une réservation.",
+                            color=config.WARNING_COLOR
+                        )
+                        notify_embed.add_field(name="👤 Client", value=user.display_name, inline=True)
+                        notify_embed.add_field(name="📅 Ancienne date", value=old_date.strftime('%d/%m/%Y à %H:%M'), inline=True)
+                        notify_embed.add_field(name="📅 Nouvelle date", value=selected_slot.strftime('%d/%m/%Y à %H:%M'), inline=True)
+                        notify_embed.add_field(name="🆔 ID", value=f"`{reschedule_booking_id}`", inline=True)
+                        notify_embed.timestamp = datetime.now(timezone.utc)
+                        await log_channel.send(content=coach_role.mention, embed=notify_embed)
+                    except:
+                        pass
+
+            # Clean up ticket data
+            await self._state_delete(ticket_channel_id)
+
+            return
+
+        # Create the Google Calendar event first, outside the transaction
+        event_id = await self.calendar_manager.run(
+            self.calendar_manager.create_booking_event,
+            start_time=selected_slot,
+            duration_minutes=duration,
+            booking_type=booking_type,
+            client_name=user.display_name,
+            discord_id=str(user.id)
+        )
+
+        if not event_id:
+            await interaction.followup.edit_message(
+                message_id=interaction.message.id,
+                embed=create_error_embed("❌ Erreur lors de la création de l'événement. Veuillez réessayer."),
+                view=None
+            )
+            return
+        self.calendar_manager.invalidate_slots(selected_slot)
+
+        # Create bookings based on quantity
+        booking_ids = []
+        created_slots = []
+
+        try:
+            async with get_async_session() as session:
+                booking = Booking(
+                    google_event_id=event_id,
                     booking_type=booking_type,
-                    scheduled_at=selected_slot,  # Placeholder date, to be updated by coach
+                    scheduled_at=selected_slot,
                     duration_minutes=duration,
-                    status="pending_schedule",
+                    status=config.STATUS_CONFIRMED,
                     ticket_channel_id=str(ticket_channel_id),
-                    notes=f"Pack de {quantity} séances - Séance {i+1}/{quantity} (à planifier)"
+                    notes=f"Pack de {quantity} séances - Séance 1/{quantity}" if quantity > 1 else None
                 )
-                session.add(placeholder)
-                session.flush()
-                booking_ids.append(placeholder.id)
-                created_slots.append(selected_slot)
+                # For packs: create placeholder bookings for remaining sessions
+                placeholders = [
+                    Booking(
+                        google_event_id=None,
+                        booking_type=booking_type,
+                        scheduled_at=selected_slot,  # Placeholder date, to be updated by coach
+                        duration_minutes=duration,
+                        status="pending_schedule",
+                        ticket_channel_id=str(ticket_channel_id),
+                        notes=f"Pack de {quantity} séances - Séance {i+1}/{quantity} (à planifier)"
+                    )
+                    for i in range(1, quantity)
+                ]
+                bookings = [booking, *placeholders]
+
+                # Get or create client
+                client_id = await get_client_id(session, str(user.id))
+                if client_id:
+                    for new_booking in bookings:
+                        new_booking.client_id = client_id
+                    session.add_all(bookings)
+                    await session.execute(
+                        update(Client)
+                        .where(Client.id == client_id)
+                        .values(total_sessions=Client.total_sessions + 1)
+                    )
+                else:
+                    # The relationship lets one flush insert the client and its bookings
+                    client = Client(
+                        discord_id=str(user.id),
+                        discord_name=user.display_name,
+                        total_sessions=1,
+                        bookings=bookings
+                    )
+                    session.add(client)
+                    invalidate_client_id(client.discord_id)
+
+                await session.flush()
+                booking_ids.extend(new_booking.id for new_booking in bookings)
+                created_slots.extend(selected_slot for _ in bookings)
+        except Exception:
+            # Don't leave an event in the calendar for a booking that was never saved
+            await self.calendar_manager.run(self.calendar_manager.delete_event, event_id)
+            self.calendar_manager.invalidate_slots(selected_slot)
+            raise
+
+        # Only the first booking has a date, pack placeholders are scheduled later
+        self.bot.dispatch("booking_scheduled", booking_ids[0], created_slots[0])
 
         # Send confirmation
         if quantity == 1:
@@ -790,7 +1043,7 @@ class Tickets(commands.Cog):
                 inline=False
             )
             embed.set_footer(text="Vous recevrez des rappels 24h et 1h avant chaque session")
-            embed.timestamp = datetime.utcnow()
+            embed.timestamp = datetime.now(timezone.utc)
 
         await interaction.followup.edit_message(
             message_id=interaction.message.id,
@@ -811,8 +1064,7 @@ class Tickets(commands.Cog):
         await self.notify_coaches(user, booking_type, created_slots[0], booking_ids[0], quantity)
 
         # Clean up ticket data
-        if ticket_channel_id in self.active_tickets:
-            del self.active_tickets[ticket_channel_id]
+        await self._state_delete(ticket_channel_id)
 
     async def notify_coaches(
         self,
@@ -859,7 +1111,7 @@ class Tickets(commands.Cog):
                 inline=False
             )
 
-        embed.timestamp = datetime.utcnow()
+        embed.timestamp = datetime.now(timezone.utc)
 
         # Send to log channel
         log_channel = user.guild.get_channel(config.LOG_CHANNEL_ID)
@@ -873,11 +1125,7 @@ class Tickets(commands.Cog):
                 print(f"❌ No permission to send to log channel")
 
         # DM each coach directly
-        for member in coach_role.members:
-            try:
-                await member.send(embed=embed)
-            except discord.Forbidden:
-                print(f"❌ Cannot send DM to coach {member.name}")
+        await broadcast_dm(get_coaches(user.guild), embed=embed)
 
     async def notify_coaches_new_ticket(self, user: discord.Member, ticket_channel: discord.TextChannel):
         """
@@ -898,13 +1146,9 @@ class Tickets(commands.Cog):
         )
         embed.add_field(name="👤 Utilisateur", value=user.mention, inline=True)
         embed.add_field(name="📩 Ticket", value=ticket_channel.mention, inline=True)
-        embed.timestamp = datetime.utcnow()
+        embed.timestamp = datetime.now(timezone.utc)
 
-        for member in coach_role.members:
-            try:
-                await member.send(embed=embed)
-            except discord.Forbidden:
-                print(f"❌ Cannot send DM to coach {member.name}")
+        await broadcast_dm(get_coaches(user.guild), embed=embed)
 
     async def handle_cancel_booking(self, interaction: discord.Interaction, booking_id: int):
         """
@@ -937,14 +1181,15 @@ class Tickets(commands.Cog):
             if not is_coach(interaction.user):
                 scheduled = booking.scheduled_at
                 if scheduled.tzinfo is None:
-                    scheduled = config.TIMEZONE.localize(scheduled)
+                    scheduled = scheduled.replace(tzinfo=config.TIMEZONE)
                 time_until = scheduled - datetime.now(config.TIMEZONE)
                 if time_until < timedelta(hours=config.CANCELLATION_NOTICE_HOURS):
+                    hours, minutes = divmod(int(time_until.total_seconds()) // 60, 60)
                     await interaction.followup.send(
                         embed=create_error_embed(
                             "❌ Annulation impossible.\n\n"
-                            f"La session est dans **{int(time_until.total_seconds() // 3600)}h "
-                            f"{int((time_until.total_seconds() % 3600) // 60)}min**.\n"
+                            f"La session est dans **{hours}h "
+                            f"{minutes}min**.\n"
                             f"Les annulations doivent être faites au moins **{config.CANCELLATION_NOTICE_HOURS}h à l'avance**.\n\n"
                             "Contactez votre coach si nécessaire."
                         ),
@@ -955,11 +1200,13 @@ class Tickets(commands.Cog):
             # Cancel booking
             booking.status = config.STATUS_CANCELLED
             session.commit()
+            self.bot.dispatch("booking_cancelled", booking.id)
 
             # Delete from Google Calendar
             if booking.google_event_id:
                 try:
-                    self.calendar_manager.delete_event(booking.google_event_id)
+                    await self.calendar_manager.run(self.calendar_manager.delete_event, booking.google_event_id)
+                    self.calendar_manager.invalidate_slots(booking.scheduled_at)
                 except Exception as e:
                     print(f"❌ Error deleting calendar event: {e}")
 
@@ -974,7 +1221,7 @@ class Tickets(commands.Cog):
             )
             embed.add_field(name="🆔 ID", value=f"`{booking_id}`", inline=False)
             embed.set_footer(text="Vous pouvez créer une nouvelle réservation à tout moment.")
-            embed.timestamp = datetime.utcnow()
+            embed.timestamp = datetime.now(timezone.utc)
 
             await interaction.followup.send(embed=embed, ephemeral=True)
 
@@ -992,7 +1239,7 @@ class Tickets(commands.Cog):
                         notify_embed.add_field(name="👤 Client", value=client.discord_name, inline=True)
                         notify_embed.add_field(name="📅 Date", value=booking.scheduled_at.strftime('%d/%m/%Y à %H:%M'), inline=True)
                         notify_embed.add_field(name="🆔 ID", value=f"`{booking_id}`", inline=True)
-                        notify_embed.timestamp = datetime.utcnow()
+                        notify_embed.timestamp = datetime.now(timezone.utc)
                         await log_channel.send(content=coach_role.mention, embed=notify_embed)
                     except:
                         pass
@@ -1035,14 +1282,15 @@ class Tickets(commands.Cog):
             if not is_coach(interaction.user):
                 scheduled = booking.scheduled_at
                 if scheduled.tzinfo is None:
-                    scheduled = config.TIMEZONE.localize(scheduled)
+                    scheduled = scheduled.replace(tzinfo=config.TIMEZONE)
                 time_until = scheduled - datetime.now(config.TIMEZONE)
                 if time_until < timedelta(hours=config.CANCELLATION_NOTICE_HOURS):
+                    hours, minutes = divmod(int(time_until.total_seconds()) // 60, 60)
                     await interaction.followup.send(
                         embed=create_error_embed(
                             "❌ Report impossible.\n\n"
-                            f"La session est dans **{int(time_until.total_seconds() // 3600)}h "
-                            f"{int((time_until.total_seconds() % 3600) // 60)}min**.\n"
+                            f"La session est dans **{hours}h "
+                            f"{minutes}min**.\n"
                             f"Les reports doivent être faits au moins **{config.CANCELLATION_NOTICE_HOURS}h à l'avance**.\n\n"
                             "Contactez votre coach si nécessaire."
                         ),
@@ -1064,13 +1312,13 @@ class Tickets(commands.Cog):
 
             # Store reschedule data
             ticket_channel_id = interaction.channel.id
-            self.active_tickets[ticket_channel_id] = {
+            await self._state_set(ticket_channel_id, {
                 'user': interaction.user,
                 'booking_type': booking_type,
                 'quantity': 1,
                 'reschedule_booking_id': booking_id,
                 'old_date': old_date
-            }
+            })
 
             view = DateSelectorView(cog=self, ticket_channel_id=ticket_channel_id)
             await interaction.followup.send(embed=embed, view=view, ephemeral=True)
@@ -1109,58 +1357,60 @@ class BookingButtonView(discord.ui.View):
             # CRITICAL: Defer OUTSIDE the lock to prevent Discord timeout
             await interaction.response.defer(ephemeral=True)
 
-            # Use GLOBAL lock to serialize ALL ticket operations (prevents all race conditions)
-            # IMPORTANT: Keep EVERYTHING inside the lock, including ticket creation
-            async with cog._global_ticket_lock:
-                print(f"🔒 [LOCK ACQUIRED] User {interaction.user.name} (ID: {user_id}) entered lock")
-
-                # Check if user is already creating a ticket right now
-                if user_id in cog._creating_tickets:
-                    print(f"⚠️ User {interaction.user.name} already creating ticket, blocking")
-                    await interaction.followup.send(
-                        embed=create_error_embed(
-                            "Création de ticket déjà en cours...\n\n"
-                            "Veuillez patienter quelques secondes."
-                        ),
-                        ephemeral=True
-                    )
-                    return
+            # One lock per user: spam clicks are serialized, other users are not blocked
+            lock = cog.ticket_creation_locks.setdefault(user_id, asyncio.Lock())
+            if lock.locked() or user_id in cog._slow_ticket_creations:
+                print(f"⚠️ User {interaction.user.name} already creating ticket, blocking")
+                await interaction.followup.send(
+                    embed=create_error_embed(
+                        "Création de ticket déjà en cours...\n\n"
+                        "Veuillez patienter quelques secondes."
+                    ),
+                    ephemeral=True
+                )
+                return
 
-                guild = interaction.guild
-                category = guild.get_channel(config.TICKET_CATEGORY_ID)
-
-                if category:
-                    # Check if user already has an open ticket by checking channel overwrites
-                    for channel in category.channels:
-                        # Skip if not a text channel
-                        if not isinstance(channel, discord.TextChannel):
-                            continue
-
-                        # Check if channel starts with "ticket-"
-                        if channel.name.startswith("ticket-"):
-                            # Check if the user has explicit permission overwrites in this channel
-                            # This means they are the owner of the ticket
-                            if interaction.user in channel.overwrites:
-                                user_overwrite = channel.overwrites[interaction.user]
-                                # If user has read_messages explicitly set to True, this is their ticket
-                                if user_overwrite.read_messages is True:
-                                    print(f"⚠️ User {interaction.user.name} already has ticket {channel.name}, blocking")
-                                    await interaction.followup.send(
-                                        embed=create_error_embed(
-                                            f"Vous avez déjà un ticket ouvert: {channel.mention}\n\n"
-                                            f"Veuillez fermer votre ticket actuel avant d'en créer un nouveau."
-                                        ),
-                                        ephemeral=True
-                                    )
-                                    return
-
-                # Mark user as creating a ticket
-                print(f"✅ User {interaction.user.name} passed checks, creating ticket...")
-                cog._creating_tickets.add(user_id)
-
-                # Create ticket INSIDE the lock to prevent race conditions
+            # IMPORTANT: Keep the check AND the creation inside the lock
+            async with lock:
                 try:
-                    ticket_channel = await cog.create_ticket(interaction.user)
+                    guild = interaction.guild
+                    category = guild.get_channel(config.TICKET_CATEGORY_ID)
+
+                    if category:
+                        # Check if user already has an open ticket (explicit read overwrite on a ticket channel)
+                        existing = cog.get_user_tickets(category, user_id)
+                        if existing:
+                            channel = existing[0]
+                            print(f"⚠️ User {interaction.user.name} already has ticket {channel.name}, blocking")
+                            await interaction.followup.send(
+                                embed=create_error_embed(
+                                    f"Vous avez déjà un ticket ouvert: {channel.mention}\n\n"
+                                    f"Veuillez fermer votre ticket actuel avant d'en créer un nouveau."
+                                ),
+                                ephemeral=True
+                            )
+                            return
+
+                    creation = asyncio.create_task(cog.create_ticket(interaction.user))
+                    try:
+                        # Only the user's wait is bounded: cancelling the creation midway could
+                        # leave a channel without its booking buttons, so it finishes in the background
+                        ticket_channel = await asyncio.wait_for(
+                            asyncio.shield(creation), timeout=TICKET_CREATION_TIMEOUT
+                        )
+                    except asyncio.TimeoutError:
+                        print(f"⚠️ Ticket creation is slow for {interaction.user.name}, finishing in background")
+                        # New clicks stay rejected until it is done (the welcome message mentions the user)
+                        cog._slow_ticket_creations[user_id] = creation
+                        creation.add_done_callback(lambda t: cog._slow_ticket_creations.pop(user_id, None))
+                        await interaction.followup.send(
+                            embed=create_error_embed(
+                                "La création du ticket prend plus de temps que prévu.\n\n"
+                                "Vous serez mentionné dans votre ticket dès qu'il sera prêt."
+                            ),
+                            ephemeral=True
+                        )
+                        return
 
                     if ticket_channel:
                         print(f"✅ Ticket {ticket_channel.name} created successfully for {interaction.user.name}")
@@ -1173,9 +1423,9 @@ class BookingButtonView(discord.ui.View):
                             ephemeral=True
                         )
                 finally:
-                    # Always remove user from creating set
-                    cog._creating_tickets.discard(user_id)
-                    print(f"🔓 [LOCK RELEASED] User {interaction.user.name} (ID: {user_id}) exited lock")
+                    # Nobody waits on the lock (busy clicks are rejected above), so drop it
+                    # to keep the dict bounded to users creating a ticket right now
+                    cog.ticket_creation_locks.pop(user_id, None)
         else:
             # Coaches bypass the lock but still need to defer
             await interaction.response.defer(ephemeral=True)
@@ -1200,3 +1450,8 @@ async def setup(bot):
 
     
     bot.add_view(BookingButtonView())
+    # Booking steps sent before a restart keep working, their state is reloaded from the database
+    bot.add_view(BookingTypeView(cog=cog, user=None, timeout=None))
+    bot.add_view(SessionQuantityView(cog=cog, user=None, timeout=None))
+    bot.add_view(DateSelectorView(cog=cog, ticket_channel_id=None, timeout=None))
+    bot.add_view(CalendarSlotsView(cog=cog, slots=[], ticket_channel_id=None, timeout=None))
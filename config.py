@@ -3,8 +3,8 @@ Configuration module for Deg Bot
 Loads environment variables and provides configuration constants
 """
 import os
+from zoneinfo import ZoneInfo
 from dotenv import load_dotenv
-import pytz
 
 # Load environment variables
 load_dotenv()
@@ -25,14 +25,19 @@ GOOGLE_CREDENTIALS_PATH = os.getenv('GOOGLE_CREDENTIALS_PATH', './credentials.js
 
 # Bot Settings
 BOOKING_SLOT_DURATION = int(os.getenv('BOOKING_SLOT_DURATION', 60))
-TIMEZONE = pytz.timezone(os.getenv('TIMEZONE', 'Europe/Paris'))
+TIMEZONE = ZoneInfo(os.getenv('TIMEZONE', 'Europe/Paris'))
 FREE_COACHING_DURATION = int(os.getenv('FREE_COACHING_DURATION', 60))
 PAID_COACHING_DURATION = int(os.getenv('PAID_COACHING_DURATION', 60))
 REMINDER_24H_ENABLED = os.getenv('REMINDER_24H_ENABLED', 'true').lower() == 'true'
 REMINDER_1H_ENABLED = os.getenv('REMINDER_1H_ENABLED', 'true').lower() == 'true'
+DEBUG_LOGGING = os.getenv('DEG_DEBUG', '0') == '1'  # Log at DEBUG level instead of INFO
 
 # Database Configuration
 DATABASE_URL = 'sqlite:///deg_bot.db'
+ASYNC_DATABASE_URL = 'sqlite+aiosqlite:///deg_bot.db'  # Same database, async driver
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', 10))  # Connections kept open in the async pool
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', 20))  # Extra connections allowed under load
+DB_STATEMENT_CACHE_SIZE = int(os.getenv('DB_STATEMENT_CACHE_SIZE', 256))  # Prepared statements kept per connection
 
 # Bot Constants
 BOT_PREFIX = '/'
@@ -44,6 +49,7 @@ WARNING_COLOR = 0xFEE75C  # Yellow
 # Ticket Settings
 TICKET_NAME_FORMAT = "ticket-{username}-{number}"
 TICKET_AUTO_CLOSE_MINUTES = 30
+TICKET_CLOSE_DELAY = 5  # Seconds before deleting a ticket closed interactively (bulk deletions don't wait)
 
 # Booking Types
 BOOKING_TYPE_FREE = "gratuit"
@@ -1,19 +1,27 @@
 """
 Database package initialization
 """
-from .db import init_db, get_session, SessionLocal, engine
-from .models import Base, Client, Booking, Feedback, Note, Event, EventParticipant
+from .db import init_db, check_async_db, get_session, get_async_session, SessionLocal, AsyncSessionLocal, engine, async_engine
+from .models import Base, Client, Booking, Feedback, Note, TicketState, Event, EventParticipant
+from .cache import get_client_id, invalidate_client_id
 
 __all__ = [
     'init_db',
+    'check_async_db',
     'get_session',
+    'get_async_session',
     'SessionLocal',
+    'AsyncSessionLocal',
     'engine',
+    'async_engine',
+    'get_client_id',
+    'invalidate_client_id',
     'Base',
     'Client',
     'Booking',
     'Feedback',
     'Note',
+    'TicketState',
     'Event',
     'EventParticipant'
 ]
@@ -0,0 +1,145 @@
+"""
+Small in-process caches for hot database lookups
+"""
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Hashable, Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from .models import Client
+
+CLIENT_CACHE_SIZE = 4096
+CLIENT_CACHE_TTL = 300  # seconds
+
+
+class TTLCache:
+    """
+    LRU cache whose entries expire after a fixed time-to-live
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+
+    def get(self, key: Hashable):
+        """
+        Return the cached value, or None if missing or expired
+        """
+        item = self._data.get(key)
+        if item is None:
+            return None
+
+        value, expires_at = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            return None
+
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: Hashable, value):
+        """
+        Store a value, evicting the least recently used entry when full
+        """
+        self._data[key] = (value, time.monotonic() + self.ttl)
+        self._data.move_to_end(key)
+        if len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Hashable):
+        """
+        Remove an entry if present
+        """
+        self._data.pop(key, None)
+
+    def keys(self):
+        """
+        Snapshot of the current keys, expired entries included
+        """
+        return list(self._data)
+
+    def clear(self):
+        """
+        Remove every entry
+        """
+        self._data.clear()
+
+
+class SingleFlight:
+    """
+    Shares one in-flight call between concurrent callers asking for the same key
+    """
+
+    def __init__(self):
+        self._tasks: Dict[Hashable, asyncio.Task] = {}
+
+    async def run(self, key: Hashable, factory: Callable[[], Awaitable]):
+        """
+        Await the call running for `key`, starting it with factory() if there is none
+        """
+        task = self._tasks.get(key)
+        if task is None:
+            task = asyncio.create_task(factory())
+            self._tasks[key] = task
+            task.add_done_callback(lambda t: self.forget(key) if self._tasks.get(key) is t else None)
+
+        # shield: a cancelled caller must not cancel the call other callers wait on
+        return await asyncio.shield(task)
+
+    def is_current(self, key: Hashable) -> bool:
+        """
+        From inside the call: whether it is still the one registered for `key`
+        (False once forgotten, e.g. when the data it reads was invalidated)
+        """
+        return self._tasks.get(key) is asyncio.current_task()
+
+    def keys(self):
+        """
+        Snapshot of the keys with a call in flight
+        """
+        return list(self._tasks)
+
+    def forget(self, key: Hashable):
+        """
+        Let the next caller start a new call, current waiters still get the running one
+        """
+        self._tasks.pop(key, None)
+
+    def clear(self):
+        """
+        Forget every call in flight
+        """
+        self._tasks.clear()
+
+
+# discord_id -> Client.id
+_client_id_cache = TTLCache(maxsize=CLIENT_CACHE_SIZE, ttl=CLIENT_CACHE_TTL)
+
+
+async def get_client_id(session: AsyncSession, discord_id: str) -> Optional[int]:
+    """
+    Return the Client id for a Discord user, using the cache when possible
+
+    Only existing clients are cached, so a user booking for the first time
+    is picked up on the next lookup.
+    """
+    client_id = _client_id_cache.get(discord_id)
+    if client_id is not None:
+        return client_id
+
+    client_id = (await session.execute(
+        select(Client.id).where(Client.discord_id == discord_id)
+    )).scalar_one_or_none()
+
+    if client_id is not None:
+        _client_id_cache.set(discord_id, client_id)
+    return client_id
+
+
+def invalidate_client_id(discord_id: str):
+    """
+    Drop a cached Client id, call it after inserting or deleting a Client
+    """
+    _client_id_cache.pop(discord_id)
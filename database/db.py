@@ -1,9 +1,11 @@
 """
 Database connection and session management
 """
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from sqlalchemy.orm import sessionmaker, Session
-from contextlib import contextmanager
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from contextlib import contextmanager, asynccontextmanager
 import config
 
 # Create engine
@@ -16,12 +18,34 @@ engine = create_engine(
 # Create session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine and session factory, used from the cogs so queries don't block the event loop
+# Connections are pooled and reused across all cogs instead of opened per session.
+# SQLAlchemy caches the compiled SQL of each select() shape, and sqlite3 keeps the
+# prepared statement for each SQL text per connection, so hot queries are not re-planned
+async_engine = create_async_engine(
+    config.ASYNC_DATABASE_URL,
+    connect_args={"cached_statements": config.DB_STATEMENT_CACHE_SIZE},
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=config.DB_POOL_SIZE,
+    max_overflow=config.DB_MAX_OVERFLOW,
+    pool_pre_ping=True,
+    echo=False  # Set to True for SQL query logging
+)
+
+# expire_on_commit=False: objects stay readable after commit (no implicit lazy refresh)
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
 def init_db():
     """
     Initialize the database by creating all tables
     """
     from .models import Base
     Base.metadata.create_all(bind=engine)
+
+    # create_all() skips existing tables, so add indexes introduced later by hand
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=engine, checkfirst=True)
     print("Database initialized successfully!")
 
 @contextmanager
@@ -44,3 +68,31 @@ def get_session() -> Session:
         raise e
     finally:
         session.close()
+
+async def check_async_db() -> str:
+    """
+    Run a trivial query through the async pool and return the pool status
+    """
+    async with async_engine.connect() as conn:
+        await conn.execute(text("SELECT 1"))
+    return async_engine.pool.status()
+
+@asynccontextmanager
+async def get_async_session() -> AsyncSession:
+    """
+    Async context manager for database sessions
+    Automatically handles commit/rollback and closing
+
+    Usage:
+        async with get_async_session() as session:
+            result = await session.execute(select(Booking).where(...))
+    """
+    session = AsyncSessionLocal()
+    try:
+        yield session
+        await session.commit()
+    except Exception as e:
+        await session.rollback()
+        raise e
+    finally:
+        await session.close()
@@ -1,7 +1,7 @@
 """
 SQLAlchemy models for Deg Bot database
 """
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text
+from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Text, Index, text
 from sqlalchemy.orm import declarative_base, relationship
 from datetime import datetime
 
@@ -32,6 +32,26 @@ class Booking(Base):
     Represents a coaching session booking
     """
     __tablename__ = "bookings"
+    __table_args__ = (
+        # Covers the per-client status/upcoming queries (my-sessions, clear-bookings)
+        Index("ix_bookings_client_status_scheduled", "client_id", "status", "scheduled_at"),
+        # Task loops (reminders, feedback, daily summary) filter on status + date
+        Index("ix_bookings_status_scheduled", "status", "scheduled_at"),
+        # Pack expiry and analytics filter on status + created_at
+        Index("ix_bookings_status_created", "status", "created_at"),
+        # Partial index for the feedback loop, only holds confirmed sessions
+        Index(
+            "ix_bookings_pending_feedback", "scheduled_at",
+            sqlite_where=text("status = 'confirmed'"),
+            postgresql_where=text("status = 'confirmed'")
+        ),
+        # Partial index for a client's upcoming sessions (/stats, /my-sessions)
+        Index(
+            "ix_bookings_client_upcoming", "client_id", "scheduled_at",
+            sqlite_where=text("status = 'confirmed'"),
+            postgresql_where=text("status = 'confirmed'")
+        ),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     client_id = Column(Integer, ForeignKey("clients.id"), nullable=False)
@@ -93,6 +113,24 @@ class Note(Base):
         return f"<Note(client_id={self.client_id}, created_at={self.created_at})>"
 
 
+class TicketState(Base):
+    """
+    Booking flow state of an open ticket, so it survives cog reloads and restarts
+    """
+    __tablename__ = "ticket_states"
+
+    ticket_channel_id = Column(String, primary_key=True)
+    user_id = Column(String, nullable=False)  # Discord ID of the member booking
+    booking_type = Column(String, nullable=False)
+    quantity = Column(Integer, nullable=True)
+    reschedule_booking_id = Column(Integer, nullable=True)
+    old_date = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, nullable=False, index=True)
+
+    def __repr__(self):
+        return f"<TicketState(ticket_channel_id='{self.ticket_channel_id}', booking_type='{self.booking_type}')>"
+
+
 class Event(Base):
     """
     Represents a Discord event (coaching de groupe, tournoi, etc.)
@@ -2,7 +2,9 @@
 Utility modules for Deg Bot
 """
 from .embeds import create_error_embed, create_success_embed, create_info_embed, create_booking_embed
-from .permissions import is_coach, is_admin, coach_only, admin_only
+from .formatting import fmt_dt, fmt_time
+from .ratelimit import AsyncRateLimiter, send_dm, broadcast_dm
+from .permissions import is_coach, is_admin, coach_only, coach_check, admin_only, get_coaches, invalidate_coaches
 
 __all__ = [
     'create_error_embed',
@@ -12,5 +14,13 @@ __all__ = [
     'is_coach',
     'is_admin',
     'coach_only',
-    'admin_only'
+    'coach_check',
+    'admin_only',
+    'get_coaches',
+    'invalidate_coaches',
+    'fmt_dt',
+    'fmt_time',
+    'AsyncRateLimiter',
+    'send_dm',
+    'broadcast_dm'
 ]
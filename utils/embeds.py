@@ -2,7 +2,7 @@
 Reusable Discord embed utilities
 """
 import discord
-from datetime import datetime
+from datetime import datetime, timezone
 from typing import Optional
 import config
 
@@ -21,7 +21,7 @@ def create_base_embed(
         color=color
     )
     if timestamp:
-        embed.timestamp = datetime.utcnow()
+        embed.timestamp = datetime.now(timezone.utc)
     return embed
 
 
@@ -104,7 +104,7 @@ def create_booking_embed(
         )
 
     embed.set_footer(text="Vous recevrez des rappels 24h et 1h avant la session")
-    embed.timestamp = datetime.utcnow()
+    embed.timestamp = datetime.now(timezone.utc)
 
     return embed
 
@@ -119,7 +119,7 @@ def create_ticket_embed(ticket_channel: discord.TextChannel) -> discord.Embed:
                     f"Rendez-vous dans {ticket_channel.mention} pour continuer.",
         color=config.SUCCESS_COLOR
     )
-    embed.timestamp = datetime.utcnow()
+    embed.timestamp = datetime.now(timezone.utc)
     return embed
 
 
@@ -143,7 +143,7 @@ def create_ticket_welcome_embed() -> discord.Embed:
         inline=False
     )
     embed.set_footer(text="Sélectionnez une option ci-dessous pour continuer")
-    embed.timestamp = datetime.utcnow()
+    embed.timestamp = datetime.now(timezone.utc)
     return embed
 
 
@@ -168,5 +168,5 @@ def create_calendar_slots_embed(slots: list, date_str: str) -> discord.Embed:
             inline=False
         )
 
-    embed.timestamp = datetime.utcnow()
+    embed.timestamp = datetime.now(timezone.utc)
     return embed
@@ -0,0 +1,20 @@
+"""
+Fast date formatting for hot loops (exports, summaries)
+"""
+from datetime import datetime
+
+
+def fmt_dt(d: datetime) -> str:
+    """
+    Format a datetime as DD/MM/YYYY HH:MM
+
+    Plain integer formatting, cheaper than strftime when called per row.
+    """
+    return f"{d.day:02d}/{d.month:02d}/{d.year} {d.hour:02d}:{d.minute:02d}"
+
+
+def fmt_time(d: datetime) -> str:
+    """
+    Format a datetime as HH:MM
+    """
+    return f"{d.hour:02d}:{d.minute:02d}"
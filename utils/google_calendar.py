@@ -5,14 +5,31 @@ from google.oauth2.credentials import Credentials
 from google.oauth2 import service_account
 from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
-from datetime import datetime, timedelta
-from typing import List, Optional, Dict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time, timedelta
+from functools import partial
+from typing import Callable, List, Optional, Dict, Tuple
+import asyncio
 import config
-import pytz
+from database.cache import SingleFlight, TTLCache
 
 # Scopes required for Google Calendar API
 SCOPES = ['https://www.googleapis.com/auth/calendar']
 
+# Maximum number of calls in a single batch request (Google Calendar API limit)
+BATCH_SIZE = 50
+
+# Available slots of a day are reused for this long (seconds) when users
+# click the same date again, bookings made through the bot invalidate it
+SLOTS_CACHE_TTL = 60
+SLOTS_CACHE_SIZE = 256
+
+# (day, duration_minutes) -> available slots, shared by every manager instance
+# and only touched from the event loop
+_slots_cache = TTLCache(maxsize=SLOTS_CACHE_SIZE, ttl=SLOTS_CACHE_TTL)
+# (day, duration_minutes) -> fetch in progress, shared by concurrent callers
+_slots_in_flight = SingleFlight()
+
 class GoogleCalendarManager:
     """
     Manager class for Google Calendar operations
@@ -23,8 +40,66 @@ class GoogleCalendarManager:
         Initialize the Google Calendar API service
         """
         self.service = None
+        # The underlying httplib2 client is not thread-safe, so every blocking
+        # call of this manager goes through one dedicated worker thread
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="google-calendar")
         self._init_service()
 
+    async def run(self, func: Callable, *args, **kwargs):
+        """
+        Run a blocking calendar method off the event loop
+
+        Usage:
+            event_id = await manager.run(manager.create_booking_event, start_time=..., ...)
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(func, *args, **kwargs))
+
+    async def get_day_slots(self, day: datetime, duration_minutes: int = 60) -> List[datetime]:
+        """
+        Available slots for the whole day of `day`, cached for SLOTS_CACHE_TTL seconds
+
+        Concurrent lookups of the same day share a single API call.
+        """
+        key = (day.date(), duration_minutes)
+        slots = _slots_cache.get(key)
+        if slots is not None:
+            return list(slots)
+
+        return list(await _slots_in_flight.run(key, lambda: self._fetch_day_slots(key, day, duration_minutes)))
+
+    async def _fetch_day_slots(self, key: Tuple[date, int], day: datetime, duration_minutes: int) -> List[datetime]:
+        start_of_day = datetime.combine(key[0], time.min, tzinfo=day.tzinfo)
+        end_of_day = datetime.combine(key[0], time.max, tzinfo=day.tzinfo)
+        slots = await self.run(
+            self.get_available_slots,
+            start_date=start_of_day,
+            end_date=end_of_day,
+            duration_minutes=duration_minutes
+        )
+        # An empty list may come from an API error, and a fetch that was
+        # invalidated while running may predate the change, keep neither
+        if slots and _slots_in_flight.is_current(key):
+            _slots_cache.set(key, slots)
+        return slots
+
+    def invalidate_slots(self, day: Optional[date] = None):
+        """
+        Drop the cached slots of a day (every duration), or of every day when None
+        """
+        if day is None:
+            _slots_cache.clear()
+            _slots_in_flight.clear()
+            return
+        if isinstance(day, datetime):
+            day = day.date()
+        for key in _slots_cache.keys():
+            if key[0] == day:
+                _slots_cache.pop(key)
+        for key in _slots_in_flight.keys():
+            if key[0] == day:
+                _slots_in_flight.forget(key)
+
     def _init_service(self):
         """
         Initialize the Google Calendar service with credentials
@@ -99,8 +174,8 @@ class GoogleCalendarManager:
                     if 'T' not in start_str:
                         # All-day event: block the entire day
                         try:
-                            event_start = config.TIMEZONE.localize(datetime.fromisoformat(start_str).replace(hour=0, minute=0))
-                            event_end = config.TIMEZONE.localize(datetime.fromisoformat(end_str).replace(hour=23, minute=59))
+                            event_start = datetime.fromisoformat(start_str).replace(hour=0, minute=0, tzinfo=config.TIMEZONE)
+                            event_end = datetime.fromisoformat(end_str).replace(hour=23, minute=59, tzinfo=config.TIMEZONE)
                         except (ValueError, AttributeError):
                             continue
                     else:
@@ -112,9 +187,9 @@ class GoogleCalendarManager:
 
                     # Make timezone-aware if needed
                     if event_start.tzinfo is None:
-                        event_start = config.TIMEZONE.localize(event_start)
+                        event_start = event_start.replace(tzinfo=config.TIMEZONE)
                     if event_end.tzinfo is None:
-                        event_end = config.TIMEZONE.localize(event_end)
+                        event_end = event_end.replace(tzinfo=config.TIMEZONE)
 
                     # Check for overlap
                     if (current_time < event_end and slot_end > event_start):
@@ -133,6 +208,51 @@ class GoogleCalendarManager:
             print(f"An error occurred: {error}")
             return []
 
+    def _build_booking_event(
+        self,
+        start_time: datetime,
+        duration_minutes: int,
+        booking_type: str,
+        client_name: str,
+        discord_id: str,
+        notes: Optional[str] = None
+    ) -> Dict:
+        """
+        Build the Google Calendar event body for a booking
+        """
+        end_time = start_time + timedelta(minutes=duration_minutes)
+
+        # Make timezone-aware
+        if start_time.tzinfo is None:
+            start_time = start_time.replace(tzinfo=config.TIMEZONE)
+        if end_time.tzinfo is None:
+            end_time = end_time.replace(tzinfo=config.TIMEZONE)
+
+        type_label = "GRATUIT" if booking_type == config.BOOKING_TYPE_FREE else "PAYANT"
+
+        return {
+            'summary': f'[{type_label}] Coaching - {client_name}',
+            'description': f"""Discord ID: {discord_id}
+Type: {booking_type}
+Réservé le: {datetime.now(config.TIMEZONE).strftime('%d/%m/%Y à %H:%M')}
+{f'Notes: {notes}' if notes else ''}""",
+            'start': {
+                'dateTime': start_time.isoformat(),
+                'timeZone': str(config.TIMEZONE),
+            },
+            'end': {
+                'dateTime': end_time.isoformat(),
+                'timeZone': str(config.TIMEZONE),
+            },
+            'reminders': {
+                'useDefault': False,
+                'overrides': [
+                    {'method': 'popup', 'minutes': 60},
+                    {'method': 'popup', 'minutes': 1440},  # 24 hours
+                ],
+            },
+        }
+
     def create_booking_event(
         self,
         start_time: datetime,
@@ -161,38 +281,9 @@ class GoogleCalendarManager:
             return None
 
         try:
-            end_time = start_time + timedelta(minutes=duration_minutes)
-
-            # Make timezone-aware
-            if start_time.tzinfo is None:
-                start_time = config.TIMEZONE.localize(start_time)
-            if end_time.tzinfo is None:
-                end_time = config.TIMEZONE.localize(end_time)
-
-            type_label = "GRATUIT" if booking_type == config.BOOKING_TYPE_FREE else "PAYANT"
-
-            event = {
-                'summary': f'[{type_label}] Coaching - {client_name}',
-                'description': f"""Discord ID: {discord_id}
-Type: {booking_type}
-Réservé le: {datetime.now(config.TIMEZONE).strftime('%d/%m/%Y à %H:%M')}
-{f'Notes: {notes}' if notes else ''}""",
-                'start': {
-                    'dateTime': start_time.isoformat(),
-                    'timeZone': str(config.TIMEZONE),
-                },
-                'end': {
-                    'dateTime': end_time.isoformat(),
-                    'timeZone': str(config.TIMEZONE),
-                },
-                'reminders': {
-                    'useDefault': False,
-                    'overrides': [
-                        {'method': 'popup', 'minutes': 60},
-                        {'method': 'popup', 'minutes': 1440},  # 24 hours
-                    ],
-                },
-            }
+            event = self._build_booking_event(
+                start_time, duration_minutes, booking_type, client_name, discord_id, notes
+            )
 
             event_result = self.service.events().insert(
                 calendarId=config.GOOGLE_CALENDAR_ID,
@@ -206,6 +297,62 @@ Réservé le: {datetime.now(config.TIMEZONE).strftime('%d/%m/%Y à %H:%M')}
             print(f"An error occurred: {error}")
             return None
 
+    def create_booking_events(
+        self,
+        start_times: List[datetime],
+        duration_minutes: int,
+        booking_type: str,
+        client_name: str,
+        discord_id: str,
+        notes: Optional[str] = None
+    ) -> List[Optional[str]]:
+        """
+        Create several booking events using batched HTTP requests
+
+        Args:
+            start_times: Start time of each booking
+            duration_minutes: Duration in minutes
+            booking_type: Type of booking (gratuit/payant)
+            client_name: Discord name of the client
+            discord_id: Discord ID of the client
+            notes: Optional notes
+
+        Returns:
+            Event ID for each start time (None where the creation failed)
+        """
+        if not self.service:
+            print("Google Calendar service not initialized")
+            return [None] * len(start_times)
+
+        event_ids: List[Optional[str]] = [None] * len(start_times)
+
+        def on_response(request_id, response, exception):
+            if exception is None:
+                event_ids[int(request_id)] = response.get('id')
+                print(f"Event created: {response.get('htmlLink')}")
+            else:
+                print(f"An error occurred: {exception}")
+
+        for start in range(0, len(start_times), BATCH_SIZE):
+            batch = self.service.new_batch_http_request(callback=on_response)
+            for index in range(start, min(start + BATCH_SIZE, len(start_times))):
+                event = self._build_booking_event(
+                    start_times[index], duration_minutes, booking_type, client_name, discord_id, notes
+                )
+                batch.add(
+                    self.service.events().insert(
+                        calendarId=config.GOOGLE_CALENDAR_ID,
+                        body=event
+                    ),
+                    request_id=str(index)
+                )
+            try:
+                batch.execute()
+            except HttpError as error:
+                print(f"An error occurred: {error}")
+
+        return event_ids
+
     def update_event(
         self,
         event_id: str,
@@ -236,7 +383,7 @@ Réservé le: {datetime.now(config.TIMEZONE).strftime('%d/%m/%Y à %H:%M')}
 
             if start_time:
                 if start_time.tzinfo is None:
-                    start_time = config.TIMEZONE.localize(start_time)
+                    start_time = start_time.replace(tzinfo=config.TIMEZONE)
                 event['start']['dateTime'] = start_time.isoformat()
 
                 if duration_minutes:
@@ -286,6 +433,48 @@ Réservé le: {datetime.now(config.TIMEZONE).strftime('%d/%m/%Y à %H:%M')}
             print(f"An error occurred: {error}")
             return False
 
+    def delete_events(self, event_ids: List[str]) -> Tuple[int, int]:
+        """
+        Delete several calendar events using batched HTTP requests
+
+        Args:
+            event_ids: Google Calendar event IDs
+
+        Returns:
+            Tuple of (deleted count, failed count)
+        """
+        if not self.service:
+            return 0, len(event_ids)
+
+        counts = {'deleted': 0, 'failed': 0}
+
+        def on_response(request_id, response, exception):
+            if exception is None:
+                counts['deleted'] += 1
+            else:
+                counts['failed'] += 1
+                print(f"An error occurred deleting event {request_id}: {exception}")
+
+        for start in range(0, len(event_ids), BATCH_SIZE):
+            batch = self.service.new_batch_http_request(callback=on_response)
+            for event_id in event_ids[start:start + BATCH_SIZE]:
+                batch.add(
+                    self.service.events().delete(
+                        calendarId=config.GOOGLE_CALENDAR_ID,
+                        eventId=event_id
+                    ),
+                    request_id=event_id
+                )
+            try:
+                batch.execute()
+            except HttpError as error:
+                print(f"An error occurred: {error}")
+                handled = counts['deleted'] + counts['failed']
+                counts['failed'] += min(start + BATCH_SIZE, len(event_ids)) - handled
+
+        print(f"Events deleted: {counts['deleted']} (failed: {counts['failed']})")
+        return counts['deleted'], counts['failed']
+
     def get_event(self, event_id: str) -> Optional[Dict]:
         """
         Get event details by ID
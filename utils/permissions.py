@@ -2,10 +2,19 @@
 Permission checking utilities and decorators
 """
 import discord
+from discord import app_commands
 from discord.ext import commands
 from functools import wraps
+from typing import Dict, List, Tuple
+import time
 import config
 
+# How long a snapshot of the coach role members is reused
+COACH_CACHE_TTL = 300  # seconds
+
+# guild id -> (expiry, coach members)
+_coach_cache: Dict[int, Tuple[float, List[discord.Member]]] = {}
+
 def is_coach(member: discord.Member) -> bool:
     """
     Check if a member has the coach role
@@ -16,6 +25,30 @@ def is_coach(member: discord.Member) -> bool:
     return coach_role in member.roles if coach_role else False
 
 
+def get_coaches(guild: discord.Guild) -> List[discord.Member]:
+    """
+    Return the members holding the coach role, from a short-lived snapshot
+
+    Role.members scans every cached guild member, so the list is rebuilt at
+    most every COACH_CACHE_TTL seconds or after invalidate_coaches().
+    """
+    cached = _coach_cache.get(guild.id)
+    if cached and cached[0] > time.monotonic():
+        return cached[1]
+
+    coach_role = guild.get_role(config.COACH_ROLE_ID)
+    coaches = list(coach_role.members) if coach_role else []
+    _coach_cache[guild.id] = (time.monotonic() + COACH_CACHE_TTL, coaches)
+    return coaches
+
+
+def invalidate_coaches(guild_id: int):
+    """
+    Drop the coach snapshot of a guild, call it when coach roles change
+    """
+    _coach_cache.pop(guild_id, None)
+
+
 def is_admin(member: discord.Member) -> bool:
     """
     Check if a member has administrator permissions
@@ -39,6 +72,22 @@ def coach_only():
     return commands.check(predicate)
 
 
+def coach_check(message: str = "Vous devez être coach pour utiliser cette commande."):
+    """
+    Decorator to restrict application commands to coaches and admins
+
+    Runs before the command body, so rejected users never reach the defer or
+    the database. The failure is answered by the command tree error handler.
+    """
+    async def predicate(interaction: discord.Interaction) -> bool:
+        member = interaction.user
+        if not isinstance(member, discord.Member) or not (is_coach(member) or is_admin(member)):
+            raise app_commands.CheckFailure(message)
+        return True
+
+    return app_commands.check(predicate)
+
+
 def admin_only():
     """
     Decorator to restrict commands to admins only
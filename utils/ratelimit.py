@@ -0,0 +1,86 @@
+"""
+Client-side rate limiting for Discord direct messages
+"""
+import asyncio
+import time
+import discord
+
+# Discord starts refusing new DMs well before its global limit, stay around 30/min
+DM_RATE_PER_MINUTE = 30
+# Retries on a 429, with doubling backoff starting at DM_RETRY_DELAY seconds
+DM_MAX_RETRIES = 3
+DM_RETRY_DELAY = 1.0
+# DMs in flight at once when broadcasting the same message
+DM_BROADCAST_CONCURRENCY = 10
+# Per-recipient DMs (reminders, feedback requests) in flight at once
+DM_CONCURRENCY = 5
+
+
+class AsyncRateLimiter:
+    """
+    Spaces calls at least 1/rate seconds apart, shared across tasks
+    """
+
+    def __init__(self, rate: float):
+        """
+        Args:
+            rate: maximum number of calls per second
+        """
+        self._interval = 1 / rate
+        self._last = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """
+        Wait until the next call is allowed
+        """
+        async with self._lock:
+            wait = self._last + self._interval - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._last = time.monotonic()
+
+
+# Shared by every DM the bot sends
+dm_limiter = AsyncRateLimiter(rate=DM_RATE_PER_MINUTE / 60)
+
+
+async def send_dm(user: discord.abc.Messageable, **kwargs) -> discord.Message:
+    """
+    Send a DM through the shared limiter, retrying with backoff when rate limited
+
+    Raises:
+        discord.Forbidden / discord.HTTPException: same as user.send, once retries are exhausted
+    """
+    delay = DM_RETRY_DELAY
+    for attempt in range(DM_MAX_RETRIES + 1):
+        await dm_limiter.acquire()
+        try:
+            return await user.send(**kwargs)
+        except discord.HTTPException as e:
+            if e.status != 429 or attempt == DM_MAX_RETRIES:
+                raise
+            await asyncio.sleep(max(getattr(e, "retry_after", 0) or 0, delay))
+            delay *= 2
+
+
+async def broadcast_dm(members, concurrency: int = DM_BROADCAST_CONCURRENCY, **kwargs):
+    """
+    Send the same DM to several members concurrently, through the shared limiter
+
+    The message kwargs (embed, content...) are built once by the caller and
+    shared by every send, so they must not be mutated until this returns.
+    Members who don't accept DMs are skipped.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def send_one(member):
+        async with semaphore:
+            try:
+                await send_dm(member, **kwargs)
+            except discord.Forbidden:
+                print(f"❌ Cannot send DM to {member.name}")
+            except discord.HTTPException as e:
+                print(f"❌ Failed to send DM to {member.name}: {e}")
+
+    await asyncio.gather(*(send_one(member) for member in members))
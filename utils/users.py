@@ -0,0 +1,51 @@
+"""
+Discord user lookup helpers
+"""
+import asyncio
+import discord
+from database.cache import SingleFlight, TTLCache
+
+# Maximum number of fetch_user HTTP calls running at the same time
+FETCH_CONCURRENCY = 5
+
+# Users fetched over HTTP (not in the gateway cache), kept for a while
+_fetched_users = TTLCache(maxsize=1024, ttl=3600)
+# Unknown users (deleted accounts, ...), remembered briefly to avoid retry storms.
+# Other HTTP errors (5xx, rate limits) are transient and never cached
+_failed_lookups = TTLCache(maxsize=1024, ttl=300)
+# user_id -> fetch in progress, shared by concurrent callers
+_in_flight = SingleFlight()
+_fetch_semaphore = asyncio.Semaphore(FETCH_CONCURRENCY)
+
+
+async def _fetch_user(bot: discord.Client, user_id: int) -> discord.User:
+    async with _fetch_semaphore:
+        return await bot.fetch_user(user_id)
+
+
+async def get_or_fetch_user(bot: discord.Client, user_id: int) -> discord.User:
+    """
+    Return a Discord user from the local caches, fetching it over HTTP only if needed
+
+    Concurrent lookups of the same user share a single HTTP call.
+
+    Raises:
+        discord.NotFound / discord.HTTPException: same as bot.fetch_user
+    """
+    user = bot.get_user(user_id) or _fetched_users.get(user_id)
+    if user is not None:
+        return user
+
+    error = _failed_lookups.get(user_id)
+    if error is not None:
+        # A fresh exception per caller, re-raising the cached one would keep growing its traceback
+        raise discord.NotFound(error.response, error.text)
+
+    try:
+        user = await _in_flight.run(user_id, lambda: _fetch_user(bot, user_id))
+    except discord.NotFound as e:
+        _failed_lookups.set(user_id, e)
+        raise
+
+    _fetched_users.set(user_id, user)
+    return user
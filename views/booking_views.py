@@ -1,6 +1,7 @@
 """
 Discord views for the booking process
 """
+import asyncio
 import discord
 from discord.ui import Button, View, Select
 from datetime import datetime, timedelta
@@ -46,13 +47,13 @@ class CoachTicketControlsView(View):
         # Confirm closure
         embed = discord.Embed(
             title="🔒 Fermeture du ticket",
-            description="Le ticket sera fermé dans 5 secondes...",
+            description=f"Le ticket sera fermé dans {config.TICKET_CLOSE_DELAY} secondes...",
             color=config.WARNING_COLOR
         )
         await interaction.response.send_message(embed=embed)
 
-        # Wait 5 seconds
-        await discord.utils.sleep_until(discord.utils.utcnow() + timedelta(seconds=5))
+        # Leave time to read the notice, then delete
+        await asyncio.sleep(config.TICKET_CLOSE_DELAY)
 
         try:
             await self.ticket_channel.delete(reason=f"Ticket fermé par {interaction.user}")
@@ -193,7 +194,8 @@ class SessionQuantityView(View):
         """
         quantity = int(interaction.data['values'][0])
         await self.cog.quantity_selected(interaction, quantity, self.user)
-        self.stop()
+        if not self.is_persistent():
+            self.stop()
 
 
 class BookingTypeView(View):
@@ -205,7 +207,7 @@ class BookingTypeView(View):
         """
         Args:
             cog: Reference to the Tickets cog
-            user: The user who created the ticket
+            user: The user who created the ticket (None: resolved from the ticket channel)
             timeout: Timeout in seconds
         """
         super().__init__(timeout=timeout)
@@ -219,7 +221,8 @@ class BookingTypeView(View):
     )
     async def free_button(self, interaction: discord.Interaction, button: Button):
         await self.cog.booking_type_selected(interaction, config.BOOKING_TYPE_FREE, self.user)
-        self.stop()
+        if not self.is_persistent():
+            self.stop()
 
     @discord.ui.button(
         label="💰 Coaching Payant",
@@ -228,7 +231,8 @@ class BookingTypeView(View):
     )
     async def paid_button(self, interaction: discord.Interaction, button: Button):
         await self.cog.booking_type_selected(interaction, config.BOOKING_TYPE_PAID, self.user)
-        self.stop()
+        if not self.is_persistent():
+            self.stop()
 
     async def on_timeout(self):
         """
@@ -243,11 +247,11 @@ class DateSelectorView(View):
     View for selecting a date (next 14 days)
     """
 
-    def __init__(self, cog, ticket_channel_id: int, timeout: float = 300):
+    def __init__(self, cog, ticket_channel_id: Optional[int], timeout: float = 300):
         """
         Args:
             cog: Reference to the Tickets cog
-            ticket_channel_id: ID of the ticket channel
+            ticket_channel_id: ID of the ticket channel (None: the channel of the interaction)
             timeout: Timeout in seconds
         """
         super().__init__(timeout=timeout)
@@ -292,9 +296,10 @@ class DateSelectorView(View):
         """
         select = interaction.data['values'][0]
         selected_date = datetime.strptime(select, "%Y-%m-%d")
-        selected_date = config.TIMEZONE.localize(selected_date)
-        await self.cog.date_selected(interaction, selected_date, self.ticket_channel_id)
-        self.stop()
+        selected_date = selected_date.replace(tzinfo=config.TIMEZONE)
+        await self.cog.date_selected(interaction, selected_date, self.ticket_channel_id or interaction.channel.id)
+        if not self.is_persistent():
+            self.stop()
 
 
 class CalendarSlotsView(View):
@@ -306,14 +311,14 @@ class CalendarSlotsView(View):
         self,
         cog,
         slots: List[datetime],
-        ticket_channel_id: int,
+        ticket_channel_id: Optional[int],
         timeout: float = 300
     ):
         """
         Args:
             cog: Reference to the Tickets cog
             slots: List of available datetime slots
-            ticket_channel_id: ID of the ticket channel
+            ticket_channel_id: ID of the ticket channel (None: the channel of the interaction)
             timeout: Timeout in seconds
         """
         super().__init__(timeout=timeout)
@@ -327,7 +332,8 @@ class CalendarSlotsView(View):
         Add select menu with available time slots
         Limited to 25 options (Discord limit)
         """
-        if not self.slots:
+        # The persistent instance has no slots but still needs the select to receive choices
+        if not self.slots and self.timeout is not None:
             return
 
         options = []
@@ -355,8 +361,9 @@ class CalendarSlotsView(View):
         """
         slot_iso = interaction.data['values'][0]
         selected_slot = datetime.fromisoformat(slot_iso)
-        await self.cog.slot_selected(interaction, selected_slot, self.ticket_channel_id)
-        self.stop()
+        await self.cog.slot_selected(interaction, selected_slot, self.ticket_channel_id or interaction.channel.id)
+        if not self.is_persistent():
+            self.stop()
 
     @discord.ui.button(
         label="❌ Annuler",
@@ -366,7 +373,8 @@ class CalendarSlotsView(View):
     async def cancel_button(self, interaction: discord.Interaction, button: Button):
         embed = create_error_embed("Réservation annulée.")
         await interaction.response.edit_message(embed=embed, view=None)
-        self.stop()
+        if not self.is_persistent():
+            self.stop()
 
 
 class ConfirmBookingView(View):